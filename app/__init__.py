@@ -1,20 +1,70 @@
 from flask import Flask
 from .database.rustic_database import RusticDatabase
+from .database.snapshot import read_snapshot
+from .database.repositories.file_price_history_repository import FilePriceHistoryRepository
+from .database.serializers.json_serializer import StdJsonSerializer
+from .database.serializers.csv_serializer import StdCsvSerializer
+from .market.file_price_provider import FilePriceProvider
+from .market.price_service import PriceService
+from .config import Config
 from os import path
 
+DATA_PATH = path.join(path.dirname(__file__), "database", "data")
+
+
+def create_database(config=None) -> RusticDatabase:
+    """
+    Base de datos configurada según ``config`` (``app.config`` o, por
+    defecto, ``Config``). La usan tanto la aplicación como los scripts de
+    mantenimiento, para que todos abran los datos con los mismos parámetros.
+    """
+    if config is None:
+        config = {key: getattr(Config, key) for key in dir(Config) if key.isupper()}
+    return RusticDatabase(
+        DATA_PATH,
+        event_queue_size=config["EVENTS_QUEUE_SIZE"],
+        change_log_size=config["CHANGE_LOG_SIZE"],
+        movement_partitioning=config["MOVEMENT_PARTITIONING"],
+        movement_compression=config["MOVEMENT_COMPRESSION"],
+        cold_after_months=config["MOVEMENT_COLD_AFTER_MONTHS"],
+        budget_thresholds=config["BUDGET_THRESHOLDS"],
+        base_currency=config["BASE_CURRENCY"],
+        duplicate_tolerance_days=config["DUPLICATE_TOLERANCE_DAYS"])
+
 
 def create_app():
     app = Flask(__name__)
 
     app.config.from_object("app.config.Config")
 
-    app.config["DATABASE"] = RusticDatabase(
-        path.join(path.dirname(__file__), "database/data"))
+    app.config["DATABASE"] = create_database(app.config)
+
+    # Arranque en caliente: cargar los usuarios cuya instantánea sigue vigente
+    if app.config["LOAD_SNAPSHOT"]:
+        snapshot = read_snapshot(app.config["SNAPSHOT_PATH"] or path.join(DATA_PATH, "cache.snapshot"))
+        if snapshot is not None:
+            loaded, stale = app.config["DATABASE"].import_cache(snapshot)
+            app.logger.info("Snapshot loaded: %d users warm, %d stale", loaded, stale)
+
+    # Servicio de precios de mercado (proveedor local por defecto)
+    app.config["PRICES"] = PriceService(
+        FilePriceProvider(
+            app.config["PRICE_FIXTURE"] or path.join(DATA_PATH, "prices", "fixtures.json"),
+            StdJsonSerializer()),
+        FilePriceHistoryRepository(DATA_PATH, StdCsvSerializer()),
+        ttl=app.config["PRICE_TTL"],
+        stale_ttl=app.config["PRICE_STALE_TTL"])
 
     # TODO: Blueprints
-    from app.routes import auth_bp, accounts_bp, movements_bp
+    from app.routes import (auth_bp, accounts_bp, movements_bp, events_bp, sync_bp,
+                            prices_bp, investments_bp, budgets_bp)
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(accounts_bp, url_prefix='/accounts')
     app.register_blueprint(movements_bp, url_prefix='/movements')
+    app.register_blueprint(events_bp, url_prefix='/events')
+    app.register_blueprint(sync_bp, url_prefix='/sync')
+    app.register_blueprint(prices_bp, url_prefix='/prices')
+    app.register_blueprint(investments_bp, url_prefix='/investments')
+    app.register_blueprint(budgets_bp, url_prefix='/budgets')
 
     return app
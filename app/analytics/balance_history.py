@@ -0,0 +1,131 @@
+# balance_history.py
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from itertools import accumulate
+from typing import Any, Dict, List, Optional
+from app.analytics.common import to_float, movement_delta
+from app.market.fx_table import FxTable, MovementAmounts
+
+
+class BalanceHistory:
+    """
+    Serie del saldo de una cuenta tras cada movimiento.
+
+    Se guarda la suma acumulada de los efectos de los movimientos ordenados
+    por fecha y se ancla en el saldo actual de ``accounts.json``: el saldo tras
+    el movimiento k es ``saldo_actual - (total - acumulado_k)``. Así, añadir un
+    movimiento posterior al último solo extiende la cola de la serie.
+    Los efectos se expresan en la moneda de la cuenta, como su saldo.
+    """
+
+    def __init__(self, account_name: str, balance: float, amounts: MovementAmounts):
+        self.account_name = account_name
+        self.balance = balance
+        self.amounts = amounts
+        self.dates: List[str] = []
+        self.cumulative = array('d')
+
+    @classmethod
+    def build(cls, account_name: str, movements: List[Dict[str, Any]], accounts: List[Dict[str, Any]],
+              fx: FxTable) -> "BalanceHistory":
+        amounts = MovementAmounts(fx, accounts)
+        history = cls(account_name, cls._account_balance(account_name, accounts), amounts)
+        points = sorted(
+            (m.get('date') or '', delta) for m in movements
+            if (delta := movement_delta(m, account_name, amounts)) != 0
+        )
+        history.dates = [d for d, _ in points]
+        history.cumulative = array('d', accumulate(delta for _, delta in points))
+        return history
+
+    @property
+    def total(self) -> float:
+        return self.cumulative[-1] if self.cumulative else 0.0
+
+    def series(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Saldo tras cada movimiento en [date_from, date_to].
+
+        Si hay ``date_from`` el primer punto es el saldo de apertura en esa fecha.
+        """
+        start = bisect_left(self.dates, date_from) if date_from else 0
+        end = bisect_right(self.dates, date_to) if date_to else len(self.dates)
+        offset = self.balance - self.total
+
+        points = []
+        if date_from:
+            opening = self.cumulative[start - 1] if start > 0 else 0.0
+            points.append({'date': date_from, 'balance': offset + opening})
+        for i in range(start, end):
+            if self.dates[i]:
+                points.append({'date': self.dates[i], 'balance': offset + self.cumulative[i]})
+        return points
+
+    def on_insert(self, index: int, movement: Dict[str, Any]) -> bool:
+        delta = movement_delta(movement, self.account_name, self.amounts)
+        if delta == 0:
+            return True
+        movement_date = movement.get('date') or ''
+        if self.dates and movement_date < self.dates[-1]:
+            # Movimiento con fecha pasada: hay que recalcular la serie
+            return False
+        self.dates.append(movement_date)
+        self.cumulative.append(self.total + delta)
+        return True
+
+    def on_delete(self, index: int, movement: Dict[str, Any]) -> bool:
+        return movement_delta(movement, self.account_name, self.amounts) == 0
+
+    def on_accounts_changed(self, accounts: List[Dict[str, Any]]) -> bool:
+        # Nuevo ancla: los puntos pasados no cambian porque el total se ajusta con el movimiento
+        self.balance = self._account_balance(self.account_name, accounts)
+        self.amounts.update(accounts)
+        return True
+
+    @staticmethod
+    def _account_balance(account_name: str, accounts: List[Dict[str, Any]]) -> float:
+        for account in accounts:
+            if account['name'] == account_name:
+                return to_float(account.get('amount'))
+        return 0.0
+
+
+def history_factory(account_name: str, fx: FxTable):
+    """Constructor para ``RusticDatabase.derived``."""
+    def build(movements: List[Dict[str, Any]], accounts: List[Dict[str, Any]]) -> BalanceHistory:
+        return BalanceHistory.build(account_name, movements, accounts, fx)
+    return build
+
+
+def downsample(points: List[Dict[str, Any]], threshold: int) -> List[Dict[str, Any]]:
+    """
+    Reduce la serie a ``threshold`` puntos con Largest-Triangle-Three-Buckets,
+    conservando la forma visual (picos y valles) de la curva.
+    """
+    if threshold >= len(points) or threshold < 3:
+        return points
+
+    xs = [date.fromisoformat(p['date']).toordinal() for p in points]
+    ys = [p['balance'] for p in points]
+    sampled = [points[0]]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Promedio del siguiente bucket como tercer vértice del triángulo
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, len(points))
+        avg_x = sum(xs[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
@@ -0,0 +1,88 @@
+# budgets.py
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+from app.analytics.common import to_float
+
+if TYPE_CHECKING:
+    from app.market.fx_table import MovementAmounts
+
+# Solo los gastos consumen presupuesto
+BUDGET_MOVEMENT_TYPE = "Gasto"
+
+
+def budget_applies(budget: Dict[str, Any], movement: Dict[str, Any]) -> bool:
+    """Indica si el movimiento consume el presupuesto (por etiqueta o por cuenta de origen)."""
+    if movement.get('type') != BUDGET_MOVEMENT_TYPE or not movement.get('date'):
+        return False
+    if budget.get('tag'):
+        return budget['tag'] in (movement.get('tags') or [])
+    return movement.get('origin') == budget.get('account')
+
+
+def budget_amount(budget: Dict[str, Any], movement: Dict[str, Any],
+                  amounts: Optional["MovementAmounts"] = None) -> float:
+    """Importe del movimiento en la moneda del presupuesto (por defecto la base)."""
+    if amounts is None:
+        return to_float(movement.get('amount'))
+    return amounts.to(movement, budget.get('currency') or amounts.base_currency)
+
+
+def apply_movement(budgets: List[Dict[str, Any]], state: Dict[str, Dict[str, float]],
+                   movement: Dict[str, Any], sign: int, thresholds: Sequence[float],
+                   amounts: Optional["MovementAmounts"] = None) -> tuple:
+    """
+    Suma (``sign`` = 1) o resta (``sign`` = -1) un movimiento del consumo
+    mensual de los presupuestos a los que afecta.
+
+    Returns:
+        (si ha cambiado el estado, [umbrales superados al alza])
+    """
+    changed = False
+    crossings = []
+    month = (movement.get('date') or '')[:7]
+    for budget in budgets:
+        if not budget_applies(budget, movement):
+            continue
+        changed = True
+        months = state.setdefault(budget['name'], {})
+        before = months.get(month, 0.0)
+        after = before + sign * budget_amount(budget, movement, amounts)
+        months[month] = after
+
+        limit = to_float(budget.get('limit'))
+        for threshold in thresholds:
+            if before < threshold * limit <= after:
+                crossings.append({
+                    'budget': budget['name'],
+                    'month': month,
+                    'threshold': threshold,
+                    'spent': after,
+                    'limit': limit,
+                })
+    return changed, crossings
+
+
+def rebuild_budget(budget: Dict[str, Any], movements: List[Dict[str, Any]],
+                   amounts: Optional["MovementAmounts"] = None) -> Dict[str, float]:
+    """Consumo mensual de un presupuesto recalculado desde el histórico."""
+    months: Dict[str, float] = {}
+    for movement in movements:
+        if budget_applies(budget, movement):
+            month = movement['date'][:7]
+            months[month] = months.get(month, 0.0) + budget_amount(budget, movement, amounts)
+    return months
+
+
+def budget_report(budgets: List[Dict[str, Any]], state: Dict[str, Dict[str, float]], month: str) -> List[Dict[str, Any]]:
+    """Consumo de cada presupuesto en un mes, leído del estado acumulado."""
+    report = []
+    for budget in budgets:
+        limit = to_float(budget.get('limit'))
+        spent = state.get(budget['name'], {}).get(month, 0.0)
+        report.append({
+            **budget,
+            'month': month,
+            'spent': spent,
+            'remaining': limit - spent,
+            'ratio': spent / limit if limit else None,
+        })
+    return report
@@ -0,0 +1,31 @@
+# common.py
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from app.market.fx_table import MovementAmounts
+
+
+def to_float(value: Any, default: float = 0.0) -> float:
+    """Convierte un campo leído del CSV a número (vacío o inválido -> ``default``)."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def movement_delta(movement: Dict[str, Any], account_name: str,
+                   amounts: Optional["MovementAmounts"] = None) -> float:
+    """
+    Efecto de un movimiento sobre el saldo de una cuenta (misma lógica que
+    update_account_balances), en la moneda de la cuenta si se pasa ``amounts``.
+    """
+    movement_type = movement.get('type', '')
+    pays = movement_type in ('Gasto', 'Transferencia', 'Inversión') and movement.get('origin') == account_name
+    receives = movement_type in ('Ingreso', 'Transferencia', 'Inversión') and movement.get('destination') == account_name
+    if pays == receives:
+        return 0.0
+    if amounts is None:
+        amount = to_float(movement.get('amount'))
+    else:
+        amount = amounts.for_account(movement, account_name)
+    return amount if receives else -amount
@@ -0,0 +1,201 @@
+# portfolio.py
+from array import array
+from collections import deque
+from typing import Any, Dict, List
+from app.analytics.common import to_float
+from app.market.fx_table import FxTable, MovementAmounts
+
+# Métodos de cálculo del coste de adquisición
+COST_METHODS = ("fifo", "average")
+
+
+class Position:
+    """
+    Posición de un símbolo en una cuenta de inversión.
+
+    Los lotes abiertos se guardan por columnas (fechas, cantidades y coste
+    unitario) para valorarlos en bloque sin crear un objeto por lote.
+    """
+
+    def __init__(self, account: str, symbol: str):
+        self.account = account
+        self.symbol = symbol
+        self.dates: List[str] = []
+        self.quantities = array('d')
+        self.unit_costs = array('d')
+        self.realized = 0.0
+
+    @property
+    def quantity(self) -> float:
+        return sum(self.quantities)
+
+    @property
+    def cost_basis(self) -> float:
+        return sum(q * c for q, c in zip(self.quantities, self.unit_costs))
+
+
+class Portfolio:
+    """
+    Posiciones derivadas de los movimientos de tipo ``Inversión``.
+
+    Un movimiento de inversión con ``symbol`` y ``quantity`` abre o cierra
+    una posición:
+    - ``quantity`` > 0: compra, la posición está en la cuenta ``destination``
+      y ``amount`` es el importe total pagado
+    - ``quantity`` < 0: venta, la posición está en la cuenta ``origin`` y
+      ``amount`` es el importe total cobrado
+
+    Los movimientos de inversión sin símbolo se siguen tratando como simples
+    transferencias y no generan posiciones. Costes y plusvalías se expresan en
+    la moneda de la cuenta de inversión, con el tipo de cambio de cada fecha.
+    """
+
+    def __init__(self, amounts: MovementAmounts, method: str = "fifo"):
+        if method not in COST_METHODS:
+            raise ValueError(f"Unknown cost method: {method}")
+        self.amounts = amounts
+        self.method = method
+        self.positions: Dict[tuple, Position] = {}
+        self.last_date = ''
+
+    @classmethod
+    def build(cls, movements: List[Dict[str, Any]], accounts: List[Dict[str, Any]], fx: FxTable,
+              method: str = "fifo") -> "Portfolio":
+        portfolio = cls(MovementAmounts(fx, accounts), method)
+        # Las posiciones dependen del orden temporal, no del de inserción
+        investments = [m for m in movements if cls._is_position_movement(m)]
+        investments.sort(key=lambda m: m.get('date') or '')
+        for movement in investments:
+            portfolio.apply(movement)
+        return portfolio
+
+    def apply(self, movement: Dict[str, Any]) -> None:
+        """
+        Raises:
+            ValueError: Si falta el tipo de cambio a la moneda de la cuenta
+        """
+        quantity = to_float(movement.get('quantity'))
+        self.last_date = max(self.last_date, movement.get('date') or '')
+        if quantity == 0:
+            return
+        symbol = movement['symbol'].upper()
+
+        if quantity > 0:
+            position = self._position(movement.get('destination', ''), symbol)
+            cost = self.amounts.for_account(movement, position.account)
+            position.dates.append(movement.get('date') or '')
+            position.quantities.append(quantity)
+            position.unit_costs.append(cost / quantity)
+            if self.method == "average":
+                self._merge_lots(position)
+            return
+
+        position = self.positions.get((movement.get('origin', ''), symbol))
+        if position is None:
+            return
+        self._sell(position, -quantity, self.amounts.for_account(movement, position.account))
+
+    def on_insert(self, index: int, movement: Dict[str, Any]) -> bool:
+        # Solo se puede aplicar en el sitio si no altera el orden temporal
+        if not self._is_position_movement(movement):
+            return True
+        if (movement.get('date') or '') < self.last_date:
+            return False
+        self.apply(movement)
+        return True
+
+    def on_delete(self, index: int, movement: Dict[str, Any]) -> bool:
+        return not self._is_position_movement(movement)
+
+    def on_accounts_changed(self, accounts: List[Dict[str, Any]]) -> bool:
+        self.amounts.update(accounts)
+        return True
+
+    def valuate(self, prices: Dict[str, float]) -> List[Dict[str, Any]]:
+        """
+        Valora todas las posiciones abiertas con la tabla de precios dada.
+
+        Los cálculos se hacen por columnas: primero se reúnen cantidades,
+        costes y precios de todas las posiciones y después se obtienen en bloque
+        el valor de mercado y la plusvalía latente.
+        """
+        positions = [p for p in self.positions.values() if p.quantities]
+        quantities = array('d', (p.quantity for p in positions))
+        costs = array('d', (p.cost_basis for p in positions))
+        unit_prices = [prices.get(p.symbol) for p in positions]
+        values = [q * price if price is not None else None for q, price in zip(quantities, unit_prices)]
+
+        result = []
+        for position, quantity, cost, price, value in zip(positions, quantities, costs, unit_prices, values):
+            gain = value - cost if value is not None else None
+            result.append({
+                'account': position.account,
+                'currency': self.amounts.account_currency(position.account),
+                'symbol': position.symbol,
+                'quantity': quantity,
+                'costBasis': cost,
+                'averageCost': cost / quantity if quantity else 0.0,
+                'price': price,
+                'marketValue': value,
+                'unrealizedGain': gain,
+                'rentability': gain / cost if gain is not None and cost else None,
+                'realizedGain': position.realized,
+                'lots': [
+                    {'date': d, 'quantity': q, 'unitCost': c}
+                    for d, q, c in zip(position.dates, position.quantities, position.unit_costs)
+                ],
+            })
+        return result
+
+    def realized_gain(self) -> float:
+        """Plusvalía realizada de todas las posiciones, incluidas las ya cerradas."""
+        return sum(p.realized for p in self.positions.values())
+
+    def symbols(self) -> List[str]:
+        return sorted({p.symbol for p in self.positions.values() if p.quantities})
+
+    @staticmethod
+    def _is_position_movement(movement: Dict[str, Any]) -> bool:
+        return movement.get('type') == 'Inversión' and bool(movement.get('symbol'))
+
+    def _position(self, account: str, symbol: str) -> Position:
+        key = (account, symbol)
+        if key not in self.positions:
+            self.positions[key] = Position(account, symbol)
+        return self.positions[key]
+
+    def _sell(self, position: Position, quantity: float, proceeds: float) -> None:
+        # FIFO consume los lotes más antiguos; en media solo hay un lote agregado
+        sold_cost = 0.0
+        remaining = quantity
+        lots = deque(zip(position.dates, position.quantities, position.unit_costs))
+        while remaining > 0 and lots:
+            date, lot_quantity, unit_cost = lots.popleft()
+            used = min(lot_quantity, remaining)
+            sold_cost += used * unit_cost
+            remaining -= used
+            if lot_quantity > used:
+                lots.appendleft((date, lot_quantity - used, unit_cost))
+                break
+
+        # Si se vende más de lo que hay, solo cuenta la parte cubierta por lotes
+        covered = quantity - remaining
+        position.realized += proceeds * (covered / quantity) - sold_cost
+        position.dates = [d for d, _, _ in lots]
+        position.quantities = array('d', (q for _, q, _ in lots))
+        position.unit_costs = array('d', (c for _, _, c in lots))
+
+    @staticmethod
+    def _merge_lots(position: Position) -> None:
+        quantity = position.quantity
+        cost = position.cost_basis
+        position.dates = position.dates[-1:]
+        position.quantities = array('d', [quantity])
+        position.unit_costs = array('d', [cost / quantity if quantity else 0.0])
+
+
+def portfolio_factory(method: str, fx: FxTable):
+    """Constructor para ``RusticDatabase.derived``."""
+    def build(movements: List[Dict[str, Any]], accounts: List[Dict[str, Any]]) -> Portfolio:
+        return Portfolio.build(movements, accounts, fx, method)
+    return build
@@ -0,0 +1,87 @@
+# statement.py
+import calendar
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from app.analytics.common import to_float, movement_delta
+
+if TYPE_CHECKING:
+    from app.market.fx_table import MovementAmounts
+
+
+def month_bounds(month: str) -> tuple:
+    """Primer y último día (ISO) de un mes ``YYYY-MM``."""
+    year, number = (int(part) for part in month.split('-'))
+    last_day = calendar.monthrange(year, number)[1]
+    return f"{month}-01", f"{month}-{last_day:02d}"
+
+
+def build_statement(month: str, accounts: List[Dict[str, Any]], movements: List[Dict[str, Any]],
+                    amounts: Optional["MovementAmounts"] = None) -> Dict[str, Any]:
+    """
+    Extracto mensual de un usuario.
+
+    Args:
+        month: Mes del extracto en formato ``YYYY-MM``
+        accounts: Cuentas con su saldo actual
+        movements: Movimientos con fecha desde el inicio del mes (incluidos los posteriores)
+        amounts: Conversor de monedas; los flujos de cada cuenta se expresan en
+            su moneda y los totales por tipo y etiqueta en la moneda base
+
+    Los saldos se anclan en el saldo actual de cada cuenta: el de cierre es el
+    actual menos el efecto de los movimientos posteriores al mes, y el de
+    apertura el de cierre menos el efecto de los movimientos del mes.
+    """
+    _, month_end = month_bounds(month)
+    by_type: Dict[str, Dict[str, float]] = {}
+    by_tag: Dict[str, Dict[str, float]] = {}
+    flows = {a['name']: {'inflow': 0.0, 'outflow': 0.0, 'later': 0.0} for a in accounts}
+    count = 0
+
+    for movement in movements:
+        in_month = (movement.get('date') or '') <= month_end
+        for name in {movement.get('origin'), movement.get('destination')}:
+            if name not in flows:
+                continue
+            delta = movement_delta(movement, name, amounts)
+            if not in_month:
+                flows[name]['later'] += delta
+            elif delta > 0:
+                flows[name]['inflow'] += delta
+            else:
+                flows[name]['outflow'] -= delta
+        if not in_month:
+            continue
+
+        count += 1
+        if amounts is None:
+            amount = to_float(movement.get('amount'))
+        else:
+            amount = amounts.to(movement, amounts.base_currency)
+        totals = by_type.setdefault(movement.get('type', ''), {'count': 0, 'total': 0.0})
+        totals['count'] += 1
+        totals['total'] += amount
+        for tag in movement.get('tags') or []:
+            totals = by_tag.setdefault(tag, {'count': 0, 'total': 0.0})
+            totals['count'] += 1
+            totals['total'] += amount
+
+    statement_accounts = []
+    for account in accounts:
+        flow = flows[account['name']]
+        closing = to_float(account.get('amount')) - flow['later']
+        statement_accounts.append({
+            'name': account['name'],
+            'currency': amounts.account_currency(account['name']) if amounts else account.get('currency'),
+            'opening': closing - flow['inflow'] + flow['outflow'],
+            'inflow': flow['inflow'],
+            'outflow': flow['outflow'],
+            'closing': closing,
+        })
+
+    return {
+        'month': month,
+        'currency': amounts.base_currency if amounts else None,
+        'movements': count,
+        'byType': by_type,
+        'byTag': by_tag,
+        'accounts': statement_accounts,
+    }
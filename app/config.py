@@ -2,4 +2,18 @@
 class Config:
     DEBUG = True                             # Modo debug para desarrollo
     PORT = 8000                          # Puerto por defecto
+    EVENTS_QUEUE_SIZE = 100                  # Eventos pendientes máximos por cliente de /events
+    EVENTS_HEARTBEAT = 15                    # Segundos entre keepalives del stream de eventos
+    CHANGE_LOG_SIZE = 1000                   # Escrituras conservadas en el registro de cambios (/sync)
+    MOVEMENT_PARTITIONING = "month"          # Particiones de movimientos: "month", "year" o None (un solo CSV)
+    MOVEMENT_COMPRESSION = "gzip"            # Compresión de particiones frías: "gzip", "lzma" o None
+    MOVEMENT_COLD_AFTER_MONTHS = 6           # Meses tras los que una partición se considera fría
+    PRICE_FIXTURE = None                     # JSON {símbolo: precio}; por defecto database/data/prices/fixtures.json
+    PRICE_TTL = 300                          # Segundos que un precio se considera reciente
+    PRICE_STALE_TTL = 3600                   # Segundos adicionales sirviendo el precio antiguo mientras se refresca
+    BUDGET_THRESHOLDS = (0.8, 1.0)           # Fracciones del límite que generan un aviso al superarse
+    BASE_CURRENCY = "EUR"                    # Moneda de las cuentas sin "currency"; tipos en database/data/fx/rates.csv
+    LOAD_SNAPSHOT = False                    # Precargar la caché desde la instantánea de snapshot.py al arrancar (pickle: solo ficheros propios)
+    SNAPSHOT_PATH = None                     # Por defecto database/data/cache.snapshot
+    DUPLICATE_TOLERANCE_DAYS = 2             # Días de diferencia admitidos al detectar movimientos duplicados
     # TODO : Implementar una configuración más avanzada
\ No newline at end of file
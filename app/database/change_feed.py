@@ -0,0 +1,70 @@
+# change_feed.py
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+# Marca que sustituye a los eventos descartados de un suscriptor desbordado
+RESYNC: Dict[str, Any] = {'seq': None, 'changes': [{'seq': None, 'type': 'resync', 'data': {}}]}
+
+
+class Subscription:
+    """
+    Cola de eventos de un cliente suscrito a los cambios de un usuario.
+
+    Cada elemento es una escritura ``{'seq', 'changes'}``. La cola está
+    acotada: si el cliente no consume a tiempo se vacía y se sustituye por la
+    marca ``RESYNC``, de modo que un cliente lento nunca hace crecer la
+    memoria del servidor.
+    """
+
+    def __init__(self, user_name: str, max_size: int):
+        self.user_name = user_name
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Espera la siguiente escritura; devuelve None si vence el timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put(self, event: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Descartar lo pendiente y pedir al cliente que recargue
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._queue.put_nowait(RESYNC)
+
+
+class ChangeFeed:
+    """Distribuye en memoria los eventos de cambio de cada usuario a sus suscriptores."""
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Subscription]] = {}
+
+    def subscribe(self, user_name: str) -> Subscription:
+        subscription = Subscription(user_name, self.max_queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_name, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_name, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.user_name, None)
+
+    def publish(self, user_name: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_name, []))
+        for subscription in subscribers:
+            subscription.put(event)
@@ -0,0 +1,96 @@
+# fingerprint_index.py
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from app.analytics.common import to_float
+from app.database.indexes.positional_index import PositionalIndex
+from app.database.indexes.text_index import tokenize
+
+
+def fingerprint(movement: Dict[str, Any]) -> tuple:
+    """
+    Huella de un movimiento sin la fecha: tipo, importe y moneda, descripción
+    normalizada (minúsculas, sin tildes ni puntuación) y cuentas.
+    """
+    return (
+        movement.get('type') or '',
+        round(to_float(movement.get('amount')), 2),
+        (movement.get('currency') or '').upper(),
+        " ".join(tokenize(movement.get('description') or '')),
+        movement.get('origin') or '',
+        movement.get('destination') or '',
+    )
+
+
+def day_number(movement: Dict[str, Any]) -> Optional[int]:
+    try:
+        return date.fromisoformat(movement.get('date') or '').toordinal()
+    except ValueError:
+        return None
+
+
+class FingerprintIndex(PositionalIndex):
+    """
+    Índice hash de huellas para detectar movimientos duplicados.
+
+    Cada huella apunta a la lista ordenada de ``(día, id)`` de los movimientos
+    que la comparten, así que buscar duplicados de un movimiento es una
+    consulta al diccionario más una búsqueda binaria por la ventana de fechas
+    admitida, independientemente del tamaño del histórico.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._entries: Dict[int, Tuple[tuple, int]] = {}
+        self._buckets: Dict[tuple, List[Tuple[int, int]]] = {}
+
+    def _add(self, doc_id: int, movement: Dict[str, Any]) -> None:
+        # Los movimientos sin fecha se agrupan en el día -1
+        key, day = fingerprint(movement), day_number(movement)
+        day = -1 if day is None else day
+        self._entries[doc_id] = (key, day)
+        insort(self._buckets.setdefault(key, []), (day, doc_id))
+
+    def _remove(self, doc_id: int) -> None:
+        key, day = self._entries.pop(doc_id)
+        bucket = self._buckets[key]
+        del bucket[bisect_left(bucket, (day, doc_id))]
+        if not bucket:
+            del self._buckets[key]
+
+    def matches(self, movement: Dict[str, Any], tolerance_days: int = 0) -> List[int]:
+        """Índices de los movimientos con la misma huella y fecha a ``tolerance_days`` días o menos."""
+        bucket = self._buckets.get(fingerprint(movement))
+        if not bucket:
+            return []
+        day = day_number(movement)
+        if day is None:
+            low, high = -1, -1
+        else:
+            low, high = day - tolerance_days, day + tolerance_days
+        start = bisect_left(bucket, (low, -1))
+        end = bisect_right(bucket, (high, self._next_id))
+        return sorted(self._position(doc_id) for _, doc_id in bucket[start:end])
+
+    def duplicate_groups(self, tolerance_days: int = 0) -> List[List[int]]:
+        """
+        Grupos de índices de movimientos que parecen duplicados entre sí: misma
+        huella y cada fecha a ``tolerance_days`` días o menos de la anterior.
+        """
+        positions = self._doc_positions()
+        groups = []
+        for bucket in self._buckets.values():
+            if len(bucket) < 2:
+                continue
+            group = [bucket[0]]
+            for entry in bucket[1:]:
+                if entry[0] - group[-1][0] <= tolerance_days:
+                    group.append(entry)
+                    continue
+                if len(group) > 1:
+                    groups.append(sorted(positions[doc_id] for _, doc_id in group))
+                group = [entry]
+            if len(group) > 1:
+                groups.append(sorted(positions[doc_id] for _, doc_id in group))
+        groups.sort()
+        return groups
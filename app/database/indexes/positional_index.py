@@ -0,0 +1,145 @@
+# positional_index.py
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional
+
+# Identificadores por bloque de PositionList (se divide al doblarlo)
+BLOCK_SIZE = 512
+
+
+class _Block(list):
+    """Tramo de PositionList con la posición de su primer elemento en ``start``."""
+
+    def __init__(self, items=(), start: int = 0):
+        super().__init__(items)
+        self.start = start
+
+
+class PositionList:
+    """
+    Lista de identificadores en orden de posición, repartida en bloques.
+
+    Cada identificador sabe en qué bloque está, así que su posición es el
+    inicio del bloque más su índice dentro de él: insertar, borrar o consultar
+    la posición de uno cuesta O(bloques + tamaño de bloque) en lugar de
+    recorrer toda la lista, también cuando se inserta en medio.
+    """
+
+    def __init__(self):
+        self._blocks: List[_Block] = [_Block()]
+        self._block_of: Dict[int, _Block] = {}
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[int]:
+        for block in self._blocks:
+            yield from block
+
+    def __reversed__(self) -> Iterator[int]:
+        for block in reversed(self._blocks):
+            yield from reversed(block)
+
+    def insert(self, index: int, doc_id: int) -> None:
+        number, block = self._locate(index, inserting=True)
+        block.insert(index - block.start, doc_id)
+        self._block_of[doc_id] = block
+        self._length += 1
+        for later in islice(self._blocks, number + 1, None):
+            later.start += 1
+
+        if len(block) > 2 * BLOCK_SIZE:
+            tail = _Block(block[BLOCK_SIZE:], block.start + BLOCK_SIZE)
+            del block[BLOCK_SIZE:]
+            for moved in tail:
+                self._block_of[moved] = tail
+            self._blocks.insert(number + 1, tail)
+
+    def pop(self, index: int) -> int:
+        if not 0 <= index < self._length:
+            raise IndexError(index)
+        number, block = self._locate(index, inserting=False)
+        doc_id = block.pop(index - block.start)
+        del self._block_of[doc_id]
+        self._length -= 1
+        for later in islice(self._blocks, number + 1, None):
+            later.start -= 1
+        if not block and len(self._blocks) > 1:
+            del self._blocks[number]
+        return doc_id
+
+    def position(self, doc_id: int) -> int:
+        block = self._block_of[doc_id]
+        return block.start + block.index(doc_id)
+
+    def _locate(self, index: int, inserting: bool) -> tuple:
+        # Al insertar, una posición en el límite entre dos bloques va al final del primero
+        for number, block in enumerate(self._blocks):
+            end = block.start + len(block)
+            if index < end or (inserting and index == end):
+                return number, block
+        return len(self._blocks) - 1, self._blocks[-1]
+
+
+class PositionalIndex(ABC):
+    """
+    Base de los índices en memoria que siguen a los movimientos por posición.
+
+    Cada movimiento recibe un identificador interno estable y ``docs`` guarda
+    esos identificadores en el orden de los índices de movimiento, de modo que
+    insertar o borrar solo toca las entradas del movimiento afectado. El mapa
+    completo identificador -> índice se mantiene al añadir al final y, tras
+    una inserción intermedia o un borrado, solo se reconstruye para consultas
+    que lo recorren entero; las consultas puntuales usan ``docs.position``.
+
+    Las subclases indexan cada movimiento en ``_add`` y lo retiran en ``_remove``.
+    """
+
+    def __init__(self):
+        self.docs = PositionList()
+        self._next_id = 0
+        self._positions: Optional[Dict[int, int]] = {}
+
+    @classmethod
+    def build(cls, movements: List[Dict[str, Any]], accounts: Optional[List[Dict[str, Any]]] = None) -> "PositionalIndex":
+        index = cls()
+        for position, movement in enumerate(movements):
+            index.on_insert(position, movement)
+        return index
+
+    def on_insert(self, index: int, movement: Dict[str, Any]) -> bool:
+        doc_id = self._next_id
+        self._next_id += 1
+        self.docs.insert(index, doc_id)
+        if self._positions is not None and index == len(self.docs) - 1:
+            self._positions[doc_id] = index
+        else:
+            self._positions = None
+        self._add(doc_id, movement)
+        return True
+
+    def on_delete(self, index: int, movement: Dict[str, Any]) -> bool:
+        doc_id = self.docs.pop(index)
+        self._positions = None
+        self._remove(doc_id)
+        return True
+
+    @abstractmethod
+    def _add(self, doc_id: int, movement: Dict[str, Any]) -> None:
+        pass
+
+    @abstractmethod
+    def _remove(self, doc_id: int) -> None:
+        pass
+
+    def _position(self, doc_id: int) -> int:
+        """Índice actual de un movimiento, sin reconstruir el mapa completo."""
+        if self._positions is not None:
+            return self._positions[doc_id]
+        return self.docs.position(doc_id)
+
+    def _doc_positions(self) -> Dict[int, int]:
+        if self._positions is None:
+            self._positions = {doc_id: position for position, doc_id in enumerate(self.docs)}
+        return self._positions
@@ -0,0 +1,232 @@
+# text_index.py
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from app.database.indexes.positional_index import PositionalIndex
+
+# Peso de cada campo en la puntuación de un término
+FIELD_WEIGHTS = {"description": 3.0, "tags": 2.0, "origin": 1.0, "destination": 1.0}
+
+# Peso relativo de una coincidencia exacta, por prefijo o aproximada
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+
+# Similitud mínima (Jaccard de trigramas) para aceptar una coincidencia aproximada
+FUZZY_THRESHOLD = 0.4
+
+# Longitud mínima de un token para buscarlo por prefijo (los más cortos solo exactos)
+MIN_PREFIX_LENGTH = 2
+
+# Términos del vocabulario que puede abarcar cada token (los de más peso)
+MAX_EXPANSIONS = 32
+
+# A partir de esta fracción del histórico, las coincidencias se ordenan por
+# recencia recorriendo el histórico en lugar de ordenar sus posiciones
+SCAN_FRACTION = 0.25
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Minúsculas, sin tildes y separado por cualquier carácter no alfanumérico."""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(c for c in normalized if not unicodedata.combining(c))
+    return TOKEN_RE.findall(stripped)
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TextIndex(PositionalIndex):
+    """
+    Índice invertido en memoria sobre descripción, cuentas y etiquetas.
+
+    Insertar o borrar un movimiento solo toca sus términos. Un vocabulario
+    ordenado resuelve los prefijos por búsqueda binaria y un mapa de
+    trigramas las coincidencias aproximadas. Cada término guarda la mayor
+    frecuencia vista, cota de la puntuación que puede aportar.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._doc_terms: Dict[int, Counter] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._max_tf: Dict[str, float] = {}
+        self._vocabulary: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = {}
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # MANTENIMIENTO
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def _add(self, doc_id: int, movement: Dict[str, Any]) -> None:
+        terms = self._movement_terms(movement)
+        self._doc_terms[doc_id] = terms
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = set()
+                insort(self._vocabulary, term)
+                for gram in trigrams(term):
+                    self._trigrams.setdefault(gram, set()).add(term)
+            postings.add(doc_id)
+            # Al borrar no se reduce: sigue siendo una cota válida
+            if terms[term] > self._max_tf.get(term, 0):
+                self._max_tf[term] = terms[term]
+
+    def _remove(self, doc_id: int) -> None:
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[term]
+                del self._max_tf[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+                for gram in trigrams(term):
+                    self._trigrams[gram].discard(term)
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # BÚSQUEDA
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[int, List[Tuple[int, float]]]:
+        """
+        Busca movimientos que contengan todos los términos de la consulta
+        (exactos, por prefijo o aproximados).
+
+        El total sale de operaciones de conjuntos sobre las listas de
+        movimientos. Las coincidencias se puntúan de la más reciente a la más
+        antigua y se para en cuanto la página está llena con puntuaciones que
+        ninguna otra puede superar, así que un término presente en casi todo el
+        histórico no obliga a puntuarlo entero.
+
+        Returns:
+            (total de coincidencias, [(índice del movimiento, puntuación)]) de la página pedida
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return 0, []
+
+        total_docs = len(self.docs) or 1
+        weighted: List[Dict[str, float]] = []
+        matched: Optional[Set[int]] = None
+        bound = 0.0
+        for token in tokens:
+            token_terms = {term: weight * math.log(1 + total_docs / len(self._postings[term]))
+                           for term, weight in self._expand(token).items()}
+            if not token_terms:
+                return 0, []
+            postings = [self._postings[term] for term in token_terms]
+            token_docs = postings[0] if len(postings) == 1 else set().union(*postings)
+            # Todos los términos de la consulta deben aparecer
+            matched = token_docs if matched is None else matched & token_docs
+            if not matched:
+                return 0, []
+            bound += max(factor * self._max_tf[term] for term, factor in token_terms.items())
+            weighted.append(token_terms)
+
+        wanted = offset + limit
+        if wanted <= 0:
+            return len(matched), []
+        ranked = self._rank(self._recent_first(matched), weighted, wanted, bound)
+        return len(matched), [(position, score) for score, position in ranked[offset:]]
+
+    def _recent_first(self, matched: Set[int]) -> Iterator[Tuple[int, int]]:
+        """(posición, identificador) de las coincidencias, de la más reciente a la más antigua."""
+        if len(matched) < SCAN_FRACTION * len(self.docs):
+            return iter(sorted(((self._position(doc_id), doc_id) for doc_id in matched), reverse=True))
+        positions = range(len(self.docs) - 1, -1, -1)
+        return ((position, doc_id) for position, doc_id in zip(positions, reversed(self.docs))
+                if doc_id in matched)
+
+    def _rank(self, candidates: Iterator[Tuple[int, int]], weighted: List[Dict[str, float]],
+              wanted: int, bound: float) -> List[Tuple[float, int]]:
+        """
+        Las ``wanted`` mejores coincidencias. A igual puntuación gana la más
+        reciente, así que basta con parar cuando la página está llena con
+        puntuaciones que alcanzan la cota: las restantes son más antiguas.
+        """
+        heap: List[Tuple[float, int]] = []
+        for position, doc_id in candidates:
+            item = (self._score(doc_id, weighted), position)
+            if len(heap) < wanted:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+            if len(heap) == wanted and heap[0][0] >= bound:
+                break
+        return sorted(heap, reverse=True)
+
+    def _score(self, doc_id: int, weighted: List[Dict[str, float]]) -> float:
+        # Por cada token cuenta el término que mejor casa con el movimiento,
+        # recorriendo el lado más corto (sus términos o los del token)
+        terms = self._doc_terms[doc_id]
+        score = 0.0
+        for token_terms in weighted:
+            if len(terms) < len(token_terms):
+                score += max(token_terms.get(term, 0.0) * tf for term, tf in terms.items())
+            else:
+                score += max(factor * terms.get(term, 0) for term, factor in token_terms.items())
+        return score
+
+    def candidates(self, texts: List[str]) -> Optional[List[int]]:
+        """
+        Índices (ordenados) de los movimientos que contienen todas las palabras
+        de ``texts`` de forma exacta, en cualquier campo.
+
+        Es un superconjunto de los que cumplen un filtro por cuenta o etiqueta,
+        así que el llamante debe comprobar el filtro sobre cada candidato.
+        Devuelve None si no hay palabras por las que acotar.
+        """
+        tokens = {token for text in texts for token in tokenize(text)}
+        if not tokens:
+            return None
+        postings = sorted((self._postings.get(token, set()) for token in tokens), key=len)
+        matched = set(postings[0]).intersection(*postings[1:])
+        positions = self._doc_positions()
+        return sorted(positions[doc_id] for doc_id in matched)
+
+    def _expand(self, token: str) -> Dict[str, float]:
+        """Términos del vocabulario que casan con el token y su peso."""
+        matches: Dict[str, float] = {}
+        if len(token) < MIN_PREFIX_LENGTH:
+            return {token: EXACT_WEIGHT} if token in self._postings else {}
+        start = bisect_left(self._vocabulary, token)
+        for term in self._vocabulary[start:]:
+            if not term.startswith(token):
+                break
+            matches[term] = EXACT_WEIGHT if term == token else PREFIX_WEIGHT
+
+        if len(token) >= 3:
+            token_grams = trigrams(token)
+            shared: Counter = Counter()
+            for gram in token_grams:
+                shared.update(self._trigrams.get(gram, ()))
+            for term, common in shared.items():
+                similarity = common / (len(token_grams) + len(trigrams(term)) - common)
+                if similarity >= FUZZY_THRESHOLD and term not in matches:
+                    matches[term] = FUZZY_WEIGHT * similarity
+
+        if len(matches) > MAX_EXPANSIONS:
+            # Un token corto o muy común casaría con buena parte del vocabulario
+            best = heapq.nlargest(MAX_EXPANSIONS, matches.items(),
+                                  key=lambda item: (item[1], len(self._postings[item[0]])))
+            matches = dict(best)
+        return matches
+
+    @staticmethod
+    def _movement_terms(movement: Dict[str, Any]) -> Counter:
+        terms: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            value = movement.get(field) or ''
+            text = " ".join(value) if isinstance(value, list) else str(value)
+            for token in tokenize(text):
+                terms[token] += weight
+        return terms
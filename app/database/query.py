@@ -0,0 +1,105 @@
+# query.py
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.analytics.common import to_float
+
+# Campos por los que se pueden ordenar los movimientos
+SORT_KEYS = ("date", "amount", "type", "description")
+
+
+class MovementQuery:
+    """
+    Filtro combinado y orden de una consulta de movimientos.
+
+    Todos los criterios son opcionales y se combinan con AND:
+    - ``types``: el tipo del movimiento es alguno de los indicados
+    - ``account``: la cuenta es el origen o el destino
+    - ``amount_min`` / ``amount_max``: importe en el rango (ambos incluidos)
+    - ``date_from`` / ``date_to``: fecha en el rango (ambos incluidos)
+    - ``tags``: el movimiento tiene todas las etiquetas indicadas
+
+    ``limit`` permite quedarse solo con los primeros resultados usando un
+    montículo de tamaño ``offset + limit`` en lugar de ordenar todo.
+    """
+
+    def __init__(self, types: Optional[List[str]] = None, account: Optional[str] = None,
+                 amount_min: Optional[float] = None, amount_max: Optional[float] = None,
+                 date_from: Optional[str] = None, date_to: Optional[str] = None,
+                 tags: Optional[List[str]] = None, sort: str = "date", descending: bool = False,
+                 limit: Optional[int] = None, offset: int = 0):
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        self.types = set(types) if types else None
+        self.account = account
+        self.amount_min = amount_min
+        self.amount_max = amount_max
+        self.date_from = date_from
+        self.date_to = date_to
+        self.tags = list(tags) if tags else []
+        self.sort = sort
+        self.descending = descending
+        self.limit = limit
+        self.offset = offset
+
+    def index_terms(self) -> List[str]:
+        """Valores exactos que un índice de texto puede usar para acotar candidatos."""
+        terms = list(self.tags)
+        if self.account:
+            terms.append(self.account)
+        return terms
+
+    def matches(self, movement: Dict[str, Any]) -> bool:
+        if self.types is not None and movement.get('type') not in self.types:
+            return False
+        if self.account is not None and self.account not in (movement.get('origin'), movement.get('destination')):
+            return False
+        if self.date_from is not None or self.date_to is not None:
+            movement_date = movement.get('date') or ''
+            if not movement_date:
+                return False
+            if self.date_from is not None and movement_date < self.date_from:
+                return False
+            if self.date_to is not None and movement_date > self.date_to:
+                return False
+        if self.amount_min is not None or self.amount_max is not None:
+            amount = to_float(movement.get('amount'))
+            if self.amount_min is not None and amount < self.amount_min:
+                return False
+            if self.amount_max is not None and amount > self.amount_max:
+                return False
+        if self.tags:
+            movement_tags = movement.get('tags') or []
+            if any(tag not in movement_tags for tag in self.tags):
+                return False
+        return True
+
+    def select(self, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> Tuple[int, List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Filtra, ordena y pagina pares ``(índice, movimiento)``.
+
+        Returns:
+            (total de coincidencias, [(índice, movimiento)]) de la página pedida
+        """
+        total = 0
+
+        def matched():
+            nonlocal total
+            for row in rows:
+                if self.matches(row[1]):
+                    total += 1
+                    yield row
+
+        # A igual valor, el índice mantiene el orden cronológico (o el inverso)
+        key = lambda row: (self._sort_value(row[1]), row[0])
+
+        if self.limit is None:
+            ordered = sorted(matched(), key=key, reverse=self.descending)
+        else:
+            pick = heapq.nlargest if self.descending else heapq.nsmallest
+            ordered = pick(self.offset + self.limit, matched(), key=key)
+        return total, ordered[self.offset:]
+
+    def _sort_value(self, movement: Dict[str, Any]) -> Any:
+        if self.sort == "amount":
+            return to_float(movement.get('amount'))
+        return movement.get(self.sort) or ''
@@ -0,0 +1,44 @@
+import os
+from typing import List, Dict, Any
+from .interfaces import BudgetRepository
+from app.database.serializers.json_serializer import JsonSerializer
+
+class FileBudgetRepository(BudgetRepository):
+    """
+    Presupuestos de cada usuario en ``budgets.json`` y su consumo acumulado
+    en ``budget_state.json`` (``{presupuesto: {mes: gastado}}``).
+
+    Los usuarios anteriores a los presupuestos no tienen ninguno de los dos
+    ficheros: se tratan como vacíos.
+    """
+
+    def __init__(self, db_path: str, serializer: JsonSerializer):
+        self.db_path = db_path
+        self.serializer = serializer
+
+    def list(self, user: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self._load(self._path(user, "budgets.json"), [])
+
+    def save(self, user: Dict[str, Any], budgets: List[Dict[str, Any]]) -> None:
+        self._dump(budgets, self._path(user, "budgets.json"))
+
+    def load_state(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        return self._load(self._path(user, "budget_state.json"), {})
+
+    def save_state(self, user: Dict[str, Any], state: Dict[str, Any]) -> None:
+        self._dump(state, self._path(user, "budget_state.json"))
+
+    def _load(self, path: str, default):
+        try:
+            return self.serializer.load(path)
+        except FileNotFoundError:
+            return default
+
+    def _dump(self, obj, path: str) -> None:
+        # El estado se reescribe en cada movimiento: no dejarlo a medias si falla
+        temp_path = path + ".tmp"
+        self.serializer.dump(obj, temp_path)
+        os.replace(temp_path, path)
+
+    def _path(self, user: Dict[str, Any], file_name: str) -> str:
+        return os.path.join(self.db_path, f"user-{user['name']}", file_name)
@@ -0,0 +1,89 @@
+import os
+import json
+from typing import List, Dict, Any, Optional
+from .interfaces import ChangeLogRepository
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+class FileChangeLogRepository(ChangeLogRepository):
+    """
+    Registro de cambios por usuario en ``user-<nombre>/changes.jsonl``.
+
+    La primera línea es una cabecera ``{"floor": n}``: el registro contiene
+    todos los cambios con ``seq > floor``. Cada línea siguiente es un cambio
+    ``{"seq", "type", "data"}``; una escritura sin cambios que notificar se
+    anota con una línea ``{"seq"}`` sin tipo para que la secuencia no tenga
+    huecos. Cuando el registro supera el doble de ``max_entries`` secuencias
+    se recorta a las ``max_entries`` más recientes.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 1000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+
+    def append(self, user: Dict[str, Any], entries: List[Dict[str, Any]]) -> None:
+        if not entries:
+            return
+        path = self._path(user)
+        while True:
+            f = open(path, "a+", encoding="utf-8")
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            # Otro proceso pudo recortar (y sustituir) el fichero mientras esperábamos
+            if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                break
+            f.close()
+
+        with f:
+            f.seek(0)
+            header = f.readline()
+            if not header:
+                # Registro nuevo: solo garantiza los cambios a partir de ahora
+                floor = entries[0]["seq"] - 1
+                f.write(json.dumps({"floor": floor}) + "\n")
+            else:
+                floor = json.loads(header)["floor"]
+            f.writelines(json.dumps(entry) + "\n" for entry in entries)
+            f.flush()
+
+            last_seq = entries[-1]["seq"]
+            if last_seq - floor > 2 * self.max_entries:
+                self._truncate(path, last_seq - self.max_entries)
+
+    def since(self, user: Dict[str, Any], seq: int) -> Optional[List[Dict[str, Any]]]:
+        # None indica que el registro no cubre ese punto (recortado o inexistente)
+        try:
+            with open(self._path(user), "r", encoding="utf-8") as f:
+                header = f.readline()
+                if not header or seq < json.loads(header)["floor"]:
+                    return None
+                entries = [entry for entry in map(json.loads, f) if entry["seq"] > seq]
+        except FileNotFoundError:
+            return None
+
+        # Solo el tramo contiguo: una secuencia que falta es una escritura que
+        # aún no ha llegado al registro, y las posteriores se enviarán después
+        entries.sort(key=lambda entry: entry["seq"])
+        changes = []
+        for entry in entries:
+            if entry["seq"] > seq + 1:
+                break
+            seq = entry["seq"]
+            changes.append(entry)
+        return changes
+
+    def _truncate(self, path: str, floor: int) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            f.readline()
+            kept = [line for line in f if json.loads(line)["seq"] > floor]
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"floor": floor}) + "\n")
+            f.writelines(kept)
+        os.replace(tmp_path, path)
+
+    def _path(self, user: Dict[str, Any]) -> str:
+        return os.path.join(self.db_path, f"user-{user['name']}", "changes.jsonl")
@@ -0,0 +1,29 @@
+import os
+from typing import List, Dict, Any, Optional
+from .interfaces import FxRateRepository
+from app.database.serializers.csv_serializer import CsvSerializer
+
+class FileFxRateRepository(FxRateRepository):
+    """
+    Tipos de cambio en ``fx/rates.csv`` (columnas date, currency, rate).
+
+    ``rate`` es el valor de una unidad de ``currency`` en la moneda base a
+    partir de ``date``. El fichero se mantiene a mano o con un proceso externo.
+    """
+
+    def __init__(self, db_path: str, serializer: CsvSerializer):
+        self.path = os.path.join(db_path, "fx", "rates.csv")
+        self.serializer = serializer
+
+    def list(self) -> List[Dict[str, Any]]:
+        try:
+            return self.serializer.load(self.path)
+        except FileNotFoundError:
+            return []
+
+    def version(self) -> Optional[int]:
+        # La fecha de modificación basta para saber si hay que recargar la tabla
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
@@ -1,17 +1,352 @@
 import os
-from typing import List, Dict, Any
+import time
+from datetime import date
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from .interfaces import MovementRepository
 from app.database.serializers.csv_serializer import CsvSerializer
+from app.database.serializers.json_serializer import JsonSerializer
+
+# Columnas con las que se crea movements.csv para cada usuario
+MOVEMENT_FIELDS = ["type", "date", "amount", "description", "origin", "destination", "tags"]
+
+# Partición para los movimientos sin fecha (se ordena después de las fechadas)
+UNDATED_PARTITION = "undated"
+
+# Longitud de la clave de partición según la granularidad ("2024" o "2024-03")
+PARTITION_KEY_LENGTHS = {"year": 4, "month": 7}
+
+# Extensión de las particiones frías según el algoritmo de compresión
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "lzma": ".xz"}
+
+def movement_in_range(movement: Dict[str, Any], date_from: Optional[str], date_to: Optional[str]) -> bool:
+    """Indica si la fecha del movimiento está en [date_from, date_to] (sin límites: siempre)."""
+    if date_from is None and date_to is None:
+        return True
+    date = movement.get('date') or ''
+    if not date:
+        return False
+    return (date_from is None or date >= date_from) and (date_to is None or date <= date_to)
 
 class FileMovementRepository(MovementRepository):
-    def __init__(self, db_path: str, serializer: CsvSerializer):
+    """
+    Movimientos de cada usuario en CSV.
+
+    Admite dos formatos, detectados por usuario:
+    - ``movements.csv``: un único fichero con todo el histórico
+    - ``movements/``: una partición CSV por mes o año más un ``manifest.json``
+      con el orden y el número de filas de cada partición
+
+    En formato particionado el índice de un movimiento es su posición en el
+    orden de las particiones (cronológico) y, dentro de cada una, de inserción.
+
+    Si se configura ``compression``, las particiones que terminan más de
+    ``cold_after_months`` meses antes del mes actual se guardan comprimidas
+    (``.csv.gz`` o ``.csv.xz``); el serializador las lee y escribe de forma
+    transparente.
+    """
+
+    def __init__(self, db_path: str, serializer: CsvSerializer,
+                 manifest_serializer: JsonSerializer, partitioning: Optional[str] = None,
+                 compression: Optional[str] = None, cold_after_months: int = 6):
+        if partitioning is not None and partitioning not in PARTITION_KEY_LENGTHS:
+            raise ValueError(f"Unknown movement partitioning: {partitioning}")
+        if compression is not None and compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unknown movement compression: {compression}")
         self.db_path = db_path
         self.serializer = serializer
+        self.manifest_serializer = manifest_serializer
+        self.partitioning = partitioning
+        self.compression = compression
+        self.cold_after_months = cold_after_months
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # LECTURA
+    # ───────────────────────────────────────────────────────────────────────────
 
     def list(self, user: Dict[str, Any]) -> List[Dict[str, Any]]:
-        path = os.path.join(self.db_path, f"user-{user['name']}", "movements.csv")
-        return self.serializer.load(path)
+        return list(self.iter_load(user))
+
+    def iter_load(self, user: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Movimientos en orden de índice, leídos fila a fila y partición a partición."""
+        manifest = self._manifest(user)
+        if manifest is None:
+            yield from self.serializer.iter_load(self._legacy_path(user))
+            return
+        for partition in manifest["partitions"]:
+            yield from self.serializer.iter_load(self._partition_path(user, partition))
+
+    def count(self, user: Dict[str, Any]) -> int:
+        """Número de movimientos; en formato particionado sale del manifiesto sin abrir ningún CSV."""
+        manifest = self._manifest(user)
+        if manifest is None:
+            return self.serializer.count(self._legacy_path(user))
+        return sum(partition["count"] for partition in manifest["partitions"])
+
+    def list_range(self, user: Dict[str, Any], date_from: Optional[str] = None,
+                   date_to: Optional[str] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Movimientos con fecha en [date_from, date_to] junto con su índice global.
+
+        En formato particionado solo se abren las particiones que solapan con
+        el rango. Los movimientos sin fecha solo se incluyen si no hay límites.
+        """
+        manifest = self._manifest(user)
+        if manifest is None:
+            rows = enumerate(self.serializer.iter_load(self._legacy_path(user)))
+            return [(i, m) for i, m in rows if movement_in_range(m, date_from, date_to)]
+
+        result = []
+        offset = 0
+        for partition in manifest["partitions"]:
+            if self._partition_overlaps(partition["key"], date_from, date_to):
+                rows = self.serializer.iter_load(self._partition_path(user, partition))
+                result.extend((offset + i, m) for i, m in enumerate(rows)
+                              if movement_in_range(m, date_from, date_to))
+            offset += partition["count"]
+        return result
+
+    def is_partitioned(self, user: Dict[str, Any]) -> bool:
+        return os.path.exists(self._manifest_path(user))
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # ESCRITURA
+    # ───────────────────────────────────────────────────────────────────────────
 
     def save(self, user: Dict[str, Any], moves: List[Dict[str, Any]]) -> None:
-        path = os.path.join(self.db_path, f"user-{user['name']}", "movements.csv")
-        self.serializer.dump(moves, path)
\ No newline at end of file
+        manifest = self._manifest(user)
+        if manifest is None:
+            self.serializer.dump(moves, self._legacy_path(user))
+            return
+        self._write_partitions(user, manifest["granularity"], moves, manifest)
+
+    def append(self, user: Dict[str, Any], movement: Dict[str, Any], count: Optional[int] = None) -> int:
+        """
+        Añade un movimiento reescribiendo solo su partición y devuelve su índice.
+
+        ``count`` es el número de movimientos antes del alta si el llamador ya
+        lo conoce (p. ej. por su caché): en formato legado el índice es ese
+        número y así no hay que releer el CSV completo para contarlo.
+        """
+        manifest = self._manifest(user)
+        if manifest is None:
+            path = self._legacy_path(user)
+            if count is None:
+                count = self.serializer.count(path)
+            self.serializer.append(movement, path)
+            return count
+
+        key = self._partition_key(movement, manifest["granularity"])
+        partitions = manifest["partitions"]
+        position = 0
+        while position < len(partitions) and self._sort_key(partitions[position]["key"]) < self._sort_key(key):
+            position += 1
+        new_partition = position == len(partitions) or partitions[position]["key"] != key
+        if new_partition:
+            partitions.insert(position, {"key": key, "file": f"{key}.csv", "count": 0})
+
+        partition = partitions[position]
+        self.serializer.append(movement, self._partition_path(user, partition))
+        index = sum(p["count"] for p in partitions[:position]) + partition["count"]
+        partition["count"] += 1
+        self._save_manifest(user, manifest)
+
+        # Una partición nueva suele indicar cambio de periodo: revisar las frías
+        if new_partition:
+            self.compact(user)
+        return index
+
+    def delete(self, user: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """Elimina un movimiento por índice reescribiendo solo su partición."""
+        manifest = self._manifest(user)
+        if manifest is None:
+            path = self._legacy_path(user)
+            movements = self.serializer.load(path)
+            if index < 0 or index >= len(movements):
+                raise IndexError(f"Movement {index} not found for user {user['name']}.")
+            movement = movements.pop(index)
+            self.serializer.dump(movements, path)
+            return movement
+
+        offset = 0
+        for position, partition in enumerate(manifest["partitions"]):
+            if index < offset + partition["count"] and index >= 0:
+                path = self._partition_path(user, partition)
+                rows = self.serializer.load(path)
+                movement = rows.pop(index - offset)
+                if rows:
+                    self.serializer.dump(rows, path)
+                    partition["count"] = len(rows)
+                else:
+                    os.remove(path)
+                    manifest["partitions"].pop(position)
+                self._save_manifest(user, manifest)
+                return movement
+            offset += partition["count"]
+        raise IndexError(f"Movement {index} not found for user {user['name']}.")
+
+    def init_user(self, user: Dict[str, Any]) -> None:
+        """Prepara el almacenamiento de un usuario nuevo según la granularidad configurada."""
+        if self.partitioning is not None and not self.is_partitioned(user):
+            self.migrate(user, self.partitioning)
+
+    def migrate(self, user: Dict[str, Any], granularity: str) -> None:
+        """
+        Convierte el almacenamiento del usuario a particiones de la granularidad
+        indicada, ya sea desde ``movements.csv`` o desde otra granularidad.
+        """
+        if granularity not in PARTITION_KEY_LENGTHS:
+            raise ValueError(f"Unknown movement partitioning: {granularity}")
+        manifest = self._manifest(user)
+        movements = self.list(user)
+        self._write_partitions(user, granularity, movements, manifest)
+
+        # El manifiesto ya apunta a las particiones: el fichero único sobra
+        legacy_path = self._legacy_path(user)
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+
+    def compact(self, user: Dict[str, Any], today: Optional[date] = None) -> List[str]:
+        """
+        Comprime las particiones frías según la política configurada.
+
+        Returns:
+            Claves de las particiones que se han comprimido
+        """
+        manifest = self._manifest(user)
+        if manifest is None or self.compression is None:
+            return []
+
+        cutoff = self._cold_cutoff(today or date.today())
+        extension = COMPRESSION_EXTENSIONS[self.compression]
+        replaced = []
+        for partition in manifest["partitions"]:
+            key = partition["key"]
+            if key == UNDATED_PARTITION or key >= cutoff[:len(key)] or self._is_compressed(partition["file"]):
+                continue
+            old_path = self._partition_path(user, partition)
+            rows = self.serializer.load(old_path)
+            partition["file"] = f"{key}.csv{extension}"
+            self.serializer.dump(rows, self._partition_path(user, partition))
+            replaced.append((key, old_path))
+
+        if replaced:
+            # El manifiesto se guarda antes de borrar: nunca apunta a ficheros ausentes
+            self._save_manifest(user, manifest)
+            for _, old_path in replaced:
+                os.remove(old_path)
+        return [key for key, _ in replaced]
+
+    def storage_report(self, user: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Tamaño en disco y latencia de lectura de cada partición del usuario."""
+        manifest = self._manifest(user)
+        if manifest is None:
+            files = [("all", self._legacy_path(user))]
+        else:
+            files = [(p["key"], self._partition_path(user, p)) for p in manifest["partitions"]]
+
+        report = []
+        for key, path in files:
+            start = time.perf_counter()
+            rows = self.serializer.load(path)
+            elapsed = time.perf_counter() - start
+            report.append({
+                "key": key,
+                "file": os.path.basename(path),
+                "compressed": self._is_compressed(path),
+                "rows": len(rows),
+                "bytes": os.path.getsize(path),
+                "read_ms": round(elapsed * 1000, 3),
+            })
+        return report
+
+    def normalize(self, movement: Dict[str, Any]) -> Dict[str, Any]:
+        # Devuelve el movimiento tal y como se leería de vuelta del CSV
+        row = {field: movement.get(field, '') for field in MOVEMENT_FIELDS}
+        row.update((k, v) for k, v in movement.items() if k not in row)
+        for key, value in row.items():
+            if key == 'tags':
+                row[key] = [str(tag) for tag in value] if isinstance(value, list) else ([] if not value else str(value).split('#'))
+            elif value is None:
+                row[key] = ''
+            elif not isinstance(value, str):
+                row[key] = str(value)
+        return row
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # AUXILIARES
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def _write_partitions(self, user: Dict[str, Any], granularity: str,
+                          moves: List[Dict[str, Any]], old_manifest: Optional[Dict[str, Any]]) -> None:
+        folder = self._partitions_folder(user)
+        os.makedirs(folder, exist_ok=True)
+
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for movement in moves:
+            groups.setdefault(self._partition_key(movement, granularity), []).append(movement)
+
+        # Conservar el fichero (y su compresión) de las particiones que ya existían
+        old_files = {p["key"]: p["file"] for p in (old_manifest or {}).get("partitions", [])}
+        partitions = []
+        for key in sorted(groups, key=self._sort_key):
+            partition = {"key": key, "file": old_files.get(key, f"{key}.csv"), "count": len(groups[key])}
+            self.serializer.dump(groups[key], self._partition_path(user, partition))
+            partitions.append(partition)
+        self._save_manifest(user, {"granularity": granularity, "partitions": partitions})
+
+        # Eliminar particiones que ya no existen en el nuevo reparto
+        current = {p["file"] for p in partitions}
+        for partition in (old_manifest or {}).get("partitions", []):
+            if partition["file"] not in current:
+                os.remove(self._partition_path(user, partition))
+        self.compact(user)
+
+    def _manifest(self, user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            return self.manifest_serializer.load(self._manifest_path(user))
+        except FileNotFoundError:
+            return None
+
+    def _save_manifest(self, user: Dict[str, Any], manifest: Dict[str, Any]) -> None:
+        self.manifest_serializer.dump(manifest, self._manifest_path(user))
+
+    @staticmethod
+    def _partition_key(movement: Dict[str, Any], granularity: str) -> str:
+        date = movement.get('date') or ''
+        length = PARTITION_KEY_LENGTHS[granularity]
+        return date[:length] if len(date) >= length else UNDATED_PARTITION
+
+    def _cold_cutoff(self, today: date) -> str:
+        # Primer mes "caliente": lo anterior se considera frío
+        months = today.year * 12 + today.month - 1 - self.cold_after_months
+        return f"{months // 12:04d}-{months % 12 + 1:02d}"
+
+    @staticmethod
+    def _is_compressed(file_name: str) -> bool:
+        return any(file_name.endswith(ext) for ext in COMPRESSION_EXTENSIONS.values())
+
+    @staticmethod
+    def _sort_key(key: str) -> Tuple[int, str]:
+        return (1, key) if key == UNDATED_PARTITION else (0, key)
+
+    @staticmethod
+    def _partition_overlaps(key: str, date_from: Optional[str], date_to: Optional[str]) -> bool:
+        if key == UNDATED_PARTITION:
+            return date_from is None and date_to is None
+        if date_from and key < date_from[:len(key)]:
+            return False
+        if date_to and key > date_to[:len(key)]:
+            return False
+        return True
+
+    def _legacy_path(self, user: Dict[str, Any]) -> str:
+        return os.path.join(self.db_path, f"user-{user['name']}", "movements.csv")
+
+    def _partitions_folder(self, user: Dict[str, Any]) -> str:
+        return os.path.join(self.db_path, f"user-{user['name']}", "movements")
+
+    def _manifest_path(self, user: Dict[str, Any]) -> str:
+        return os.path.join(self._partitions_folder(user), "manifest.json")
+
+    def _partition_path(self, user: Dict[str, Any], partition: Dict[str, Any]) -> str:
+        return os.path.join(self._partitions_folder(user), partition["file"])
@@ -0,0 +1,75 @@
+import os
+import csv
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from .interfaces import PriceHistoryRepository
+from app.database.serializers.csv_serializer import CsvSerializer
+
+class FilePriceHistoryRepository(PriceHistoryRepository):
+    """
+    Histórico diario de precios en ``prices/<SIMBOLO>.csv`` (columnas date, price).
+
+    De cada fichero se recuerda la fecha de su última fila, dónde empieza y el
+    tamaño del fichero tras la última escritura propia, así que registrar un
+    precio no vuelve a leer el histórico: se añade una fila o se sustituye la
+    última. Si otro proceso ha modificado el fichero, se vuelve a localizar.
+    """
+
+    def __init__(self, db_path: str, serializer: CsvSerializer):
+        self.path = os.path.join(db_path, "prices")
+        self.serializer = serializer
+        self._lock = threading.Lock()
+        self._tails: Dict[str, Tuple[str, int, int]] = {}   # ruta -> (última fecha, inicio de la fila, tamaño)
+        os.makedirs(self.path, exist_ok=True)
+
+    def list(self, symbol: str) -> List[Dict[str, Any]]:
+        try:
+            return self.serializer.load(self._path(symbol))
+        except FileNotFoundError:
+            return []
+
+    def record(self, symbol: str, date: str, price: float) -> None:
+        # Un único precio por día: el último observado sustituye al anterior
+        path = self._path(symbol)
+        with self._lock:
+            size = os.path.getsize(path) if os.path.exists(path) else None
+            tail = self._tails.get(path)
+            if tail is None or tail[2] != size:
+                tail = self._read_tail(path)
+
+            if tail is not None and tail[0] == date:
+                # Quitar la última fila y escribirla de nuevo con el precio actual
+                offset = tail[1]
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+            else:
+                offset = size
+            self.serializer.append({'date': date, 'price': str(price)}, path)
+            if offset is None:
+                # Fichero nuevo: la fila va tras la cabecera que acaba de escribirse
+                self._tails[path] = self._read_tail(path)
+            else:
+                self._tails[path] = (date, offset, os.path.getsize(path))
+
+    def _read_tail(self, path: str) -> Optional[Tuple[str, int, int]]:
+        """Localiza la última fila del fichero recorriéndolo una vez."""
+        try:
+            with open(path, "rb") as f:
+                header = f.readline()
+                offset, position = None, len(header)
+                for line in f:
+                    offset = position
+                    position += len(line)
+                if offset is None:
+                    return None
+                f.seek(offset)
+                last = f.readline()
+        except FileNotFoundError:
+            return None
+        fieldnames, row = csv.reader([header.decode("utf-8"), last.decode("utf-8")])
+        return row[fieldnames.index('date')], offset, position
+
+    def _path(self, symbol: str) -> str:
+        # Los símbolos vienen del cliente: evitar rutas fuera del directorio
+        safe_symbol = "".join(c for c in symbol.upper() if c.isalnum() or c in "-_.^")
+        return os.path.join(self.path, f"{safe_symbol}.csv")
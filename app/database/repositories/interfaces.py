@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 class UserRepository(ABC):
     @abstractmethod
@@ -17,4 +17,42 @@ class MovementRepository(ABC):
     @abstractmethod
     def list(self, user: Dict[str, Any]) -> List[Dict[str, Any]]: ...
     @abstractmethod
-    def save(self, user: Dict[str, Any], moves: List[Dict[str, Any]]) -> None: ...
\ No newline at end of file
+    def iter_load(self, user: Dict[str, Any]) -> Iterator[Dict[str, Any]]: ...
+    @abstractmethod
+    def count(self, user: Dict[str, Any]) -> int: ...
+    @abstractmethod
+    def save(self, user: Dict[str, Any], moves: List[Dict[str, Any]]) -> None: ...
+    @abstractmethod
+    def list_range(self, user: Dict[str, Any], date_from: Optional[str], date_to: Optional[str]) -> List[Tuple[int, Dict[str, Any]]]: ...
+    @abstractmethod
+    def append(self, user: Dict[str, Any], movement: Dict[str, Any], count: Optional[int] = None) -> int: ...
+    @abstractmethod
+    def delete(self, user: Dict[str, Any], index: int) -> Dict[str, Any]: ...
+
+class ChangeLogRepository(ABC):
+    @abstractmethod
+    def append(self, user: Dict[str, Any], entries: List[Dict[str, Any]]) -> None: ...
+    @abstractmethod
+    def since(self, user: Dict[str, Any], seq: int) -> Optional[List[Dict[str, Any]]]: ...
+
+class PriceHistoryRepository(ABC):
+    @abstractmethod
+    def list(self, symbol: str) -> List[Dict[str, Any]]: ...
+    @abstractmethod
+    def record(self, symbol: str, date: str, price: float) -> None: ...
+
+class BudgetRepository(ABC):
+    @abstractmethod
+    def list(self, user: Dict[str, Any]) -> List[Dict[str, Any]]: ...
+    @abstractmethod
+    def save(self, user: Dict[str, Any], budgets: List[Dict[str, Any]]) -> None: ...
+    @abstractmethod
+    def load_state(self, user: Dict[str, Any]) -> Dict[str, Any]: ...
+    @abstractmethod
+    def save_state(self, user: Dict[str, Any], state: Dict[str, Any]) -> None: ...
+
+class FxRateRepository(ABC):
+    @abstractmethod
+    def list(self) -> List[Dict[str, Any]]: ...
+    @abstractmethod
+    def version(self) -> Optional[int]: ...
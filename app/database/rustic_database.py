@@ -1,45 +1,252 @@
 # rustic_database.py
+import os
+import threading
 from app.database.repositories.file_user_repository import FileUserRepository
 from app.database.repositories.file_account_repository import FileAccountRepository
-from app.database.repositories.file_movement_repository import FileMovementRepository
+from app.database.repositories.file_movement_repository import FileMovementRepository, movement_in_range
+from app.database.repositories.file_change_log_repository import FileChangeLogRepository
+from app.database.repositories.file_budget_repository import FileBudgetRepository
+from app.database.repositories.file_fx_rate_repository import FileFxRateRepository
 from app.database.serializers.json_serializer import StdJsonSerializer
 from app.database.serializers.csv_serializer import StdCsvSerializer
+from app.database.versioning import VersionTable
+from app.database.user_view import UserView
+from app.database.change_feed import ChangeFeed
+from app.database.snapshot import file_mtimes, VIEW_FIELDS
+from app.database.indexes.text_index import TextIndex
+from app.database.indexes.fingerprint_index import FingerprintIndex
+from app.database.query import MovementQuery
+from app.analytics.budgets import apply_movement, rebuild_budget, budget_report
+from app.analytics.common import to_float
+from app.market.fx_table import FxTable, MovementAmounts
+
+USERS_KEY = "users"
 
 class RusticDatabase:
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, event_queue_size: int = 100, change_log_size: int = 1000,
+                 movement_partitioning: str | None = None, movement_compression: str | None = None,
+                 cold_after_months: int = 6, budget_thresholds: tuple = (0.8, 1.0),
+                 base_currency: str = "EUR", duplicate_tolerance_days: int = 0):
         json_ser = StdJsonSerializer()
         csv_ser  = StdCsvSerializer()
+        self.base_path = base_path
         self.users_repo     = FileUserRepository(base_path, json_ser)
         self.accounts_repo  = FileAccountRepository(base_path, json_ser)
-        self.movements_repo = FileMovementRepository(base_path, csv_ser)
+        self.movements_repo = FileMovementRepository(base_path, csv_ser, json_ser, movement_partitioning,
+                                                     movement_compression, cold_after_months)
+        self.changes_repo   = FileChangeLogRepository(base_path, change_log_size)
+        self.budgets_repo   = FileBudgetRepository(base_path, json_ser)
+        self.budget_thresholds = tuple(sorted(budget_thresholds))
+        self.duplicate_tolerance_days = duplicate_tolerance_days
+
+        # Tipos de cambio para cuentas y movimientos en otras monedas
+        self.fx = FxTable(FileFxRateRepository(base_path, csv_ser), base_currency)
+
+        # Caché en memoria validada contra la tabla de versiones compartida,
+        # de modo que varios workers pueden servir lecturas sin releer ficheros
+        self.versions = VersionTable(base_path)
+        self._lock = threading.RLock()
+        self._users: list | None = None
+        self._users_version = -1
+        self._views: dict[str, UserView] = {}
+
+        # Eventos de cambio para los clientes suscritos (GET /events)
+        self.feed = ChangeFeed(event_queue_size)
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # CACHÉ Y VERSIONES
+    # ───────────────────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _user_key(user: dict) -> str:
+        return f"user-{user['name']}"
+
+    def _list_users(self) -> list:
+        """Lista de usuarios cacheada mientras ``users.json`` no cambie."""
+        with self._lock:
+            version = self.versions.current(USERS_KEY)
+            if self._users is None or self._users_version != version:
+                # La versión se lee antes que el fichero: si otro proceso escribe
+                # entre medias, la siguiente comprobación forzará una recarga
+                self._users = self.users_repo.list()
+                self._users_version = version
+            return self._users
+
+    def _view(self, user: dict) -> UserView:
+        """Devuelve la vista en memoria del usuario, descartándola si está obsoleta."""
+        key = self._user_key(user)
+        version = self.versions.current(key)
+        view = self._views.get(key)
+        if view is None or view.version != version:
+            view = UserView(version)
+            self._views[key] = view
+        return view
+
+    def _accounts(self, user: dict, view: UserView) -> list:
+        if view.accounts is None:
+            view.accounts = self.accounts_repo.list(user)
+        return view.accounts
+
+    def _movements(self, user: dict, view: UserView) -> list:
+        if view.movements is None:
+            view.movements = self.movements_repo.list(user)
+        return view.movements
+
+    def _commit(self, user: dict, view: UserView, changes: list) -> int:
+        """
+        Publica una escritura ya persistida incrementando la versión del usuario.
+
+        Si nadie más escribió desde que se validó la vista, esta pasa a la nueva
+        versión y conserva sus datos; si no, se descarta para recargarla.
+
+        La nueva versión es también la secuencia de la escritura: sus cambios
+        se anotan en el registro sin soltar el bloqueo de la versión, de modo
+        que el registro queda en orden de secuencia aunque escriban varios
+        workers, y después se publican para los suscriptores.
+
+        Args:
+            changes: Lista de tuplas ``(tipo, datos)``
+        """
+        key = self._user_key(user)
+        entries = []
+
+        def log(seq: int) -> None:
+            entries.extend({'seq': seq, 'type': change_type, 'data': data} for change_type, data in changes)
+            self.changes_repo.append(user, entries or [{'seq': seq}])
+
+        version = self.versions.bump(key, log)
+        if view.version == version - 1:
+            view.version = version
+        else:
+            self._views.pop(key, None)
+        if entries:
+            self.feed.publish(user['name'], {'seq': version, 'changes': entries})
+        return version
+
+    def _prepare_budgets(self, user: dict, movement: dict, sign: int) -> tuple:
+        """
+        Calcula el efecto de un movimiento añadido (``sign`` = 1) o borrado
+        (-1) en el consumo de los presupuestos, sin guardarlo todavía.
+
+        Se llama antes de escribir nada: si falta un tipo de cambio, la
+        escritura se rechaza entera.
+
+        Returns:
+            (estado a guardar o None si no cambia, cambios a notificar por los umbrales superados)
+
+        Raises:
+            ValueError: Si falta el tipo de cambio de la moneda de algún presupuesto
+        """
+        budgets = self.budgets_repo.list(user)
+        if not budgets:
+            return None, []
+        state = self.budgets_repo.load_state(user)
+        changed, crossings = apply_movement(budgets, state, movement, sign, self.budget_thresholds,
+                                            self.movement_amounts(user))
+        return (state if changed else None), [('budget_threshold_crossed', crossing) for crossing in crossings]
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # OPERACIONES
+    # ───────────────────────────────────────────────────────────────────────────
 
-        
     def register_user(self, user: dict) -> None:
         """Register a new user in the database."""
-        users = self.users_repo.list()
-        if any(u['name'] == user['name'] for u in users):
-            raise ValueError(f"User {user['name']} already exists.")
-        self.users_repo.add_user_folder(user['name'])
-        users.append(user)
-        self.users_repo.save(users)
+        with self._lock:
+            users = list(self._list_users())
+            if any(u['name'] == user['name'] for u in users):
+                raise ValueError(f"User {user['name']} already exists.")
+            self.users_repo.add_user_folder(user['name'])
+            self.movements_repo.init_user(user)
+            users.append(user)
+            self.users_repo.save(users)
+            self.versions.bump(USERS_KEY)
+            self._views.pop(self._user_key(user), None)
 
     def register_account(self, user:dict ,account: dict) -> None:
         """Register a new account in the database."""
-        accounts = self.accounts_repo.list(user)
-        if any(a['name'] == account['name'] for a in accounts):
-            raise ValueError(f"Account {account['name']} already exists.")
-        accounts.append(account)
-        self.accounts_repo.save(user, accounts)
-
-    def register_movement(self, user: dict, movement: dict) -> None:
-        """Register a new movement in the database."""
-        movements = self.movements_repo.list(user)
-        movements.append(movement)
-        self.movements_repo.save(user, movements)
+        with self._lock:
+            accounts = self.read_accounts(user)
+            if any(a['name'] == account['name'] for a in accounts):
+                raise ValueError(f"Account {account['name']} already exists.")
+            accounts.append(account)
+            self.save_accounts(user, accounts)
+
+    def register_movement(self, user: dict, movement: dict) -> int:
+        """Register a new movement in the database and return its index."""
+        with self._lock:
+            stored = self.movements_repo.normalize(movement)
+            budget_state, budget_changes = self._prepare_budgets(user, stored, 1)
+            view = self._view(user)
+            index = self._append_movement(user, view, stored)
+            self._movement_created(user, view, index, stored, budget_state, budget_changes)
+            return index
+
+    def add_movement(self, user: dict, movement: dict) -> int:
+        """
+        Aplica un movimiento a los saldos y lo registra; devuelve su índice.
+
+        Todo lo que puede rechazarlo (saldos, tipos de cambio de los
+        presupuestos) se comprueba antes de escribir el movimiento. Si falla
+        la escritura del propio movimiento se deshace el cambio de saldos; un
+        fallo posterior ya no la deshace, porque el movimiento está guardado.
+
+        Raises:
+            ValueError: Si el movimiento no puede aplicarse (cuenta, saldo o tipo de cambio)
+        """
+        with self._lock:
+            stored = self.movements_repo.normalize(movement)
+            budget_state, budget_changes = self._prepare_budgets(user, stored, 1)
+            self.update_account_balances(user, movement)
+            view = self._view(user)
+            try:
+                index = self._append_movement(user, view, stored)
+            except Exception:
+                self.revert_account_balances(user, movement)
+                raise
+            self._movement_created(user, view, index, stored, budget_state, budget_changes)
+            return index
+
+    def _append_movement(self, user: dict, view: UserView, stored: dict) -> int:
+        # Solo se reescribe la partición afectada; la vista se actualiza en memoria
+        count = len(view.movements) if view.movements is not None else None
+        index = self.movements_repo.append(user, stored, count)
+        if view.movements is not None:
+            view.movements.insert(index, stored)
+            view.movement_inserted(index, stored)
+        return index
+
+    def _movement_created(self, user: dict, view: UserView, index: int, stored: dict,
+                          budget_state: dict | None, budget_changes: list) -> None:
+        if budget_state is not None:
+            self.budgets_repo.save_state(user, budget_state)
+        self._commit(user, view, [('movement_created', {'index': index, 'movement': stored})] + budget_changes)
+
+    def delete_movement(self, user: dict, index: int) -> dict:
+        """
+        Elimina un movimiento por su índice revirtiendo antes su efecto en los saldos.
+
+        Raises:
+            IndexError: Si el índice no corresponde a ningún movimiento
+            ValueError: Si la reversión de saldos no es posible
+        """
+        with self._lock:
+            movement = self.read_movement(user, index)
+            budget_state, _ = self._prepare_budgets(user, movement, -1)
+            self.revert_account_balances(user, movement)
+
+            view = self._view(user)
+            self.movements_repo.delete(user, index)
+            if view.movements is not None:
+                view.movements.pop(index)
+                view.movement_deleted(index, movement)
+            if budget_state is not None:
+                self.budgets_repo.save_state(user, budget_state)
+            self._commit(user, view, [('movement_deleted', {'index': index})])
+            return movement
 
     def read_user(self, user_name: str) -> dict | None:
         """Get a user by name."""
-        users = self.users_repo.list()
+        users = self._list_users()
         for user in users:
             if user['name'] == user_name:
                 return user
@@ -47,17 +254,442 @@ class RusticDatabase:
     
     def read_account(self, user: dict, account_name: str) -> dict:
         """Get an account by name for a specific user."""
-        accounts = self.accounts_repo.list(user)
+        accounts = self.read_accounts(user)
         for account in accounts:
             if account['name'] == account_name:
                 return account
         raise ValueError(f"Account {account_name} not found for user {user['name']}.")
+
+    def read_accounts(self, user: dict) -> list:
+        """Get all accounts for a specific user (copies safe to modify)."""
+        with self._lock:
+            view = self._view(user)
+            return [dict(account) for account in self._accounts(user, view)]
     
     def read_movements(self, user: dict) -> list:
         """Get all movements for a specific user."""
-        movements = self.movements_repo.list(user)
-        return movements
+        with self._lock:
+            view = self._view(user)
+            return list(self._movements(user, view))
+
+    def count_movements(self, user: dict) -> int:
+        """Número de movimientos sin cargarlos si no están ya en memoria."""
+        with self._lock:
+            view = self._view(user)
+            if view.movements is not None:
+                return len(view.movements)
+            return self.movements_repo.count(user)
+
+    def iter_movements(self, user: dict):
+        """
+        Recorre los movimientos del usuario en orden de índice.
+
+        Si la vista no los tiene en memoria se leen del disco fila a fila sin
+        guardarlos en la caché, de modo que recorrer todo el histórico no
+        obliga a mantenerlo entero en memoria.
+        """
+        with self._lock:
+            view = self._view(user)
+            if view.movements is not None:
+                # Copia superficial: la lista puede cambiar mientras se recorre
+                return iter(list(view.movements))
+        return self.movements_repo.iter_load(user)
+
+    def read_movements_range(self, user: dict, date_from: str | None = None,
+                             date_to: str | None = None) -> list:
+        """
+        Movimientos con fecha en [date_from, date_to] como pares ``(índice, movimiento)``.
+
+        Si la vista ya tiene los movimientos en memoria se filtran ahí; si no, el
+        repositorio abre solo las particiones que solapan con el rango.
+        """
+        with self._lock:
+            view = self._view(user)
+            if view.movements is None:
+                return self.movements_repo.list_range(user, date_from, date_to)
+            return [(i, m) for i, m in enumerate(view.movements)
+                    if movement_in_range(m, date_from, date_to)]
+
+    def migrate_movements(self, user: dict, granularity: str) -> None:
+        """Reorganiza los movimientos del usuario en particiones de la granularidad indicada."""
+        with self._lock:
+            view = self._view(user)
+            self.movements_repo.migrate(user, granularity)
+            # El orden (y por tanto los índices) puede cambiar: los clientes deben recargar
+            view.movements = None
+            view.derived.clear()
+            self._commit(user, view, [('resync', {})])
+
+    def compact_movements(self, user: dict) -> list:
+        """
+        Comprime las particiones frías del usuario y devuelve sus claves.
+
+        El contenido y el orden no cambian, así que la vista sigue siendo
+        válida; la versión se incrementa igualmente porque cambian los ficheros.
+        """
+        with self._lock:
+            view = self._view(user)
+            compressed = self.movements_repo.compact(user)
+            if compressed:
+                self._commit(user, view, [])
+            return compressed
+
+    def read_movement(self, user: dict, index: int) -> dict:
+        """
+        Get a single movement by index without copying the whole list.
+
+        Raises:
+            IndexError: Si el índice no corresponde a ningún movimiento
+        """
+        with self._lock:
+            movements = self._movements(user, self._view(user))
+            if index < 0 or index >= len(movements):
+                raise IndexError(f"Movement {index} not found for user {user['name']}.")
+            return movements[index]
+
+    def derived(self, user: dict, name: str, factory):
+        """
+        Estructura derivada de los movimientos del usuario, cacheada por versión.
+
+        Args:
+            name: Clave de la estructura en la vista (p. ej. "portfolio:fifo")
+            factory: Función que la construye a partir de ``(movimientos, cuentas)``
+        """
+        with self._lock:
+            view = self._view(user)
+            if name not in view.derived:
+                view.derived[name] = factory(self._movements(user, view), self._accounts(user, view))
+            return view.derived[name]
+
+    def search_movements(self, user: dict, query: str, limit: int = 20, offset: int = 0) -> tuple:
+        """
+        Búsqueda de texto sobre los movimientos del usuario.
+
+        Returns:
+            (total de coincidencias, [(índice, movimiento, puntuación)]) de la página pedida
+        """
+        with self._lock:
+            # Índice y lista en la misma vista para que las posiciones coincidan
+            index = self.derived(user, 'text_index', TextIndex.build)
+            movements = self._movements(user, self._view(user))
+            total, hits = index.search(query, limit, offset)
+            return total, [(i, movements[i], score) for i, score in hits]
+
+    def find_duplicates(self, user: dict, movement: dict) -> list:
+        """Índices de los movimientos que parecen el mismo que ``movement`` (huella y fecha cercana)."""
+        with self._lock:
+            index = self.derived(user, 'fingerprints', FingerprintIndex.build)
+            return index.matches(self.movements_repo.normalize(movement), self.duplicate_tolerance_days)
+
+    def list_duplicates(self, user: dict) -> list:
+        """Grupos de índices de movimientos del histórico que parecen duplicados."""
+        with self._lock:
+            index = self.derived(user, 'fingerprints', FingerprintIndex.build)
+            return index.duplicate_groups(self.duplicate_tolerance_days)
+
+    def import_movements(self, user: dict, movements: list, skip_duplicates: bool = True) -> dict:
+        """
+        Registra una lista de movimientos ya validados actualizando los saldos.
+
+        Cada fila se compara con el índice de huellas, que se actualiza con
+        cada alta, así que también se detectan duplicados dentro del propio
+        lote. Cada alta pasa por ``add_movement``, así que una fila rechazada
+        no deja nada escrito; su error se anota y no detiene el resto.
+
+        Returns:
+            {"created": [índices], "duplicates": [{"row", "duplicateOf"}], "errors": [{"row", "error"}]}
+        """
+        result = {'created': [], 'duplicates': [], 'errors': []}
+        with self._lock:
+            for row, movement in enumerate(movements):
+                try:
+                    self.resolve_currency(user, movement)
+                    duplicates = self.find_duplicates(user, movement)
+                    if duplicates:
+                        result['duplicates'].append({'row': row, 'duplicateOf': duplicates})
+                        if skip_duplicates:
+                            continue
+                    result['created'].append(self.add_movement(user, movement))
+                except ValueError as ve:
+                    result['errors'].append({'row': row, 'error': str(ve)})
+                except Exception as e:
+                    result['errors'].append({'row': row, 'error': f'Error creating movement: {str(e)}'})
+        return result
+
+    def query_movements(self, user: dict, query: MovementQuery) -> tuple:
+        """
+        Movimientos que cumplen la consulta, ordenados y paginados.
+
+        El punto de partida es el más barato disponible:
+        1. Si el índice de texto ya está construido y la consulta filtra por
+           cuenta o etiquetas, solo se examinan sus candidatos.
+        2. Si filtra por fechas, ``read_movements_range`` (que sin caché abre
+           solo las particiones del rango).
+        3. Si no, todos los movimientos (leídos en streaming si no están en caché).
+
+        Returns:
+            (total de coincidencias, [(índice, movimiento)]) de la página pedida
+        """
+        with self._lock:
+            view = self._view(user)
+            index = view.derived.get('text_index')
+            candidates = None
+            if index is not None and view.movements is not None:
+                candidates = index.candidates(query.index_terms())
+
+            if candidates is not None:
+                rows = ((i, view.movements[i]) for i in candidates)
+            elif query.date_from is not None or query.date_to is not None:
+                rows = self.read_movements_range(user, query.date_from, query.date_to)
+            else:
+                rows = enumerate(self.iter_movements(user))
+            return query.select(rows)
+
+    def save_accounts(self, user: dict, accounts: list) -> None:
+        """Persist the full list of accounts for a specific user."""
+        with self._lock:
+            view = self._view(user)
+            previous = {a['name']: a.get('amount') for a in self._accounts(user, view)}
+            self.accounts_repo.save(user, accounts)
+            view.accounts = [dict(account) for account in accounts]
+            view.accounts_changed(view.accounts)
+
+            # Notificar solo las cuentas nuevas o cuyo saldo ha cambiado
+            changes = []
+            for index, account in enumerate(accounts):
+                if account['name'] not in previous:
+                    changes.append(('account_created', {'index': index, 'account': dict(account)}))
+                elif previous[account['name']] != account.get('amount'):
+                    changes.append(('account_balance_changed', {
+                        'index': index, 'name': account['name'], 'amount': account.get('amount')}))
+            self._commit(user, view, changes)
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # PRESUPUESTOS
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def read_budgets(self, user: dict, month: str) -> list:
+        """Consumo de los presupuestos del usuario en un mes ``YYYY-MM``, sin recorrer movimientos."""
+        with self._lock:
+            return budget_report(self.budgets_repo.list(user), self.budgets_repo.load_state(user), month)
+
+    def save_budget(self, user: dict, budget: dict) -> None:
+        """
+        Crea un presupuesto o sustituye el del mismo nombre.
+
+        Es el único momento en que se recorre el histórico: a partir de aquí el
+        consumo se mantiene con cada alta o baja de movimiento.
+        """
+        with self._lock:
+            view = self._view(user)
+            budgets = [b for b in self.budgets_repo.list(user) if b['name'] != budget['name']]
+            budgets.append(budget)
+            state = self.budgets_repo.load_state(user)
+            state[budget['name']] = rebuild_budget(budget, self._movements(user, view),
+                                                   MovementAmounts(self.fx, self._accounts(user, view)))
+            self.budgets_repo.save(user, budgets)
+            self.budgets_repo.save_state(user, state)
+            self._commit(user, view, [('budget_saved', {'budget': budget})])
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # SINCRONIZACIÓN
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def current_seq(self, user: dict) -> int:
+        """Última secuencia de cambios (versión) del usuario."""
+        return self.versions.current(self._user_key(user))
+
+    def changes_since(self, user: dict, seq: int) -> tuple | None:
+        """
+        Cambios posteriores a ``seq`` en orden de aplicación.
+
+        Returns:
+            (secuencia alcanzada, [cambios]); la secuencia puede quedar por
+            detrás de la actual si hay escrituras que aún no están en el
+            registro. None si el registro ya no cubre ese punto (recortado, o
+            una secuencia que el servidor no conoce) y el cliente necesita una
+            instantánea completa.
+        """
+        current = self.current_seq(user)
+        if seq == current:
+            return seq, []
+        if seq > current:
+            return None
+        entries = self.changes_repo.since(user, seq)
+        if entries is None:
+            return None
+        reached = entries[-1]['seq'] if entries else seq
+        # Las marcas de escrituras sin cambios solo sirven para avanzar la secuencia
+        return reached, [entry for entry in entries if 'type' in entry]
+
+    def snapshot(self, user: dict) -> dict:
+        """Cuentas y movimientos del usuario junto con la secuencia a la que corresponden."""
+        with self._lock:
+            while True:
+                seq = self.current_seq(user)
+                accounts = self.read_accounts(user)
+                movements = self.read_movements(user)
+                # Reintentar si otro proceso escribió mientras se leía
+                if self.current_seq(user) == seq:
+                    return {'seq': seq, 'accounts': accounts, 'movements': movements}
     
+    # ───────────────────────────────────────────────────────────────────────────
+    # INSTANTÁNEA DE LA CACHÉ
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def export_cache(self) -> dict:
+        """
+        Usuarios, cuentas, movimientos e índice de texto de todos los usuarios,
+        con la versión y las fechas de modificación de los ficheros de las que
+        proceden, para guardarlos con ``write_snapshot``.
+        """
+        with self._lock:
+            users = list(self._list_users())
+            data = {
+                'users': users,
+                'users_version': self._users_version,
+                'users_mtime': self._mtime(self.users_repo.path),
+                'views': {},
+            }
+            for user in users:
+                key = self._user_key(user)
+                folder = os.path.join(self.base_path, key)
+                # Si otro proceso escribe mientras se lee, se reintenta; si no se
+                # consigue, el usuario se queda fuera y se cargará bajo demanda
+                for _ in range(3):
+                    version = self.versions.current(key)
+                    mtimes = file_mtimes(folder)
+                    view = self._view(user)
+                    self._accounts(user, view)
+                    self._movements(user, view)
+                    self.derived(user, 'text_index', TextIndex.build)
+                    if self.versions.current(key) == version == view.version and file_mtimes(folder) == mtimes:
+                        data['views'][key] = {
+                            'version': version,
+                            'mtimes': mtimes,
+                            'accounts': view.accounts,
+                            'movements': view.movements,
+                            'derived': {'text_index': view.derived['text_index']},
+                        }
+                        break
+            return data
+
+    def import_cache(self, data: dict) -> tuple:
+        """
+        Carga en la caché las partes de una instantánea que siguen vigentes.
+
+        Un usuario solo se carga si su versión y las fechas de modificación de
+        todos sus ficheros coinciden con las de la instantánea; el resto se
+        cargará bajo demanda como siempre. Las partes a las que les faltan
+        campos se descartan igual que las obsoletas.
+
+        Returns:
+            (usuarios cargados, usuarios descartados por obsoletos o incompletos)
+        """
+        with self._lock:
+            if ('users' in data and 'users_version' in data
+                    and self.versions.current(USERS_KEY) == data['users_version']
+                    and self._mtime(self.users_repo.path) == data.get('users_mtime')):
+                self._users = data['users']
+                self._users_version = data['users_version']
+
+            views = data.get('views')
+            loaded = stale = 0
+            for key, entry in (views.items() if isinstance(views, dict) else ()):
+                if (not isinstance(key, str) or not isinstance(entry, dict)
+                        or any(field not in entry for field in VIEW_FIELDS)
+                        or not isinstance(entry['derived'], dict)):
+                    stale += 1
+                    continue
+                folder = os.path.join(self.base_path, key)
+                if self.versions.current(key) != entry['version'] or file_mtimes(folder) != entry['mtimes']:
+                    stale += 1
+                    continue
+                view = UserView(entry['version'])
+                view.accounts = entry['accounts']
+                view.movements = entry['movements']
+                view.derived = entry['derived']
+                self._views[key] = view
+                loaded += 1
+            return loaded, stale
+
+    @staticmethod
+    def _mtime(path: str) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    # ───────────────────────────────────────────────────────────────────────────
+    # MONEDAS
+    # ───────────────────────────────────────────────────────────────────────────
+
+    def account_totals(self, user: dict, currency: str | None = None) -> dict:
+        """
+        Saldos de todas las cuentas convertidos a ``currency`` (por defecto la base)
+        con el último tipo de cambio conocido.
+
+        Raises:
+            ValueError: Si falta el tipo de cambio de alguna moneda
+        """
+        accounts = self.read_accounts(user)
+        target = (currency or self.fx.base_currency).upper()
+        currencies = [self.account_currency(a) for a in accounts]
+        converted = self.fx.convert_many(
+            (to_float(a.get('amount')) for a in accounts), currencies, [None] * len(accounts), target)
+        return {
+            'currency': target,
+            'total': sum(converted),
+            'accounts': [
+                {'name': a['name'], 'currency': c, 'amount': to_float(a.get('amount')), 'converted': value}
+                for a, c, value in zip(accounts, currencies, converted)
+            ],
+        }
+
+    def movement_totals(self, user: dict, date_from: str | None = None, date_to: str | None = None,
+                        currency: str | None = None) -> dict:
+        """
+        Importe total por tipo de los movimientos en [date_from, date_to],
+        convertidos a ``currency`` con el tipo de cambio de la fecha de cada uno.
+
+        Raises:
+            ValueError: Si falta el tipo de cambio de alguna moneda o fecha
+        """
+        target = (currency or self.fx.base_currency).upper()
+        amounts = self.movement_amounts(user)
+        movements = [m for _, m in self.read_movements_range(user, date_from, date_to)]
+        converted = self.fx.convert_many(
+            (to_float(m.get('amount')) for m in movements),
+            [amounts.currency(m) for m in movements],
+            [m.get('date') or None for m in movements],
+            target)
+        by_type: dict = {}
+        for movement, value in zip(movements, converted):
+            by_type[movement.get('type', '')] = by_type.get(movement.get('type', ''), 0.0) + value
+        return {'currency': target, 'movements': len(movements), 'byType': by_type}
+
+    def account_currency(self, account: dict) -> str:
+        """Moneda de una cuenta (las cuentas sin ``currency`` están en la moneda base)."""
+        return (account.get('currency') or self.fx.base_currency).upper()
+
+    def movement_amounts(self, user: dict) -> MovementAmounts:
+        """Conversor de importes de movimientos con las monedas de las cuentas del usuario."""
+        return MovementAmounts(self.fx, self.read_accounts(user))
+
+    def resolve_currency(self, user: dict, movement: dict) -> None:
+        """
+        Fija ``currency`` en un movimiento sin ella que va entre cuentas de
+        distinta moneda: el importe es el de la cuenta de origen, y así queda
+        explícito en el histórico aunque cambien las cuentas. Los demás
+        movimientos no la necesitan (todas sus cuentas comparten moneda).
+        """
+        if movement.get('currency') or movement.get('type') not in ('Transferencia', 'Inversión'):
+            return
+        amounts = self.movement_amounts(user)
+        origin_currency = amounts.account_currency(movement.get('origin'))
+        if origin_currency != amounts.account_currency(movement.get('destination')):
+            movement['currency'] = origin_currency
+
     def update_account_balances(self, user: dict, movement: dict) -> None:
         """
         Actualiza los saldos de las cuentas basado en el tipo de movimiento.
@@ -69,9 +701,9 @@ class RusticDatabase:
         Raises:
             ValueError: Si una cuenta requerida no existe o el saldo es insuficiente
         """
-        accounts = self.accounts_repo.list(user)
+        accounts = self.read_accounts(user)
+        amounts = MovementAmounts(self.fx, accounts)
         movement_type = movement.get('type', '')
-        amount = float(movement.get('amount', 0))
         origin = movement.get('origin', '')
         destination = movement.get('destination', '')
         
@@ -89,7 +721,7 @@ class RusticDatabase:
                 dest_account = find_account(destination)
                 if not dest_account:
                     raise ValueError(f"Cuenta destino '{destination}' no encontrada")
-                dest_account['amount'] = float(dest_account['amount']) + amount
+                dest_account['amount'] = float(dest_account['amount']) + amounts.for_account(movement, destination)
                 
         elif movement_type == 'Gasto':
             # Para gastos, decrementar el saldo de la cuenta origen
@@ -98,6 +730,7 @@ class RusticDatabase:
                 if not orig_account:
                     raise ValueError(f"Cuenta origen '{origin}' no encontrada")
                 
+                amount = amounts.for_account(movement, origin)
                 new_balance = float(orig_account['amount']) - amount
                 if new_balance < 0:
                     raise ValueError(f"Saldo insuficiente en cuenta '{origin}'. Saldo actual: {orig_account['amount']}, cantidad solicitada: {amount}")
@@ -119,16 +752,17 @@ class RusticDatabase:
                 raise ValueError(f"Cuenta destino '{destination}' no encontrada")
             
             # Verificar saldo suficiente en origen
+            amount = amounts.for_account(movement, origin)
             new_orig_balance = float(orig_account['amount']) - amount
             if new_orig_balance < 0:
                 raise ValueError(f"Saldo insuficiente en cuenta origen '{origin}'. Saldo actual: {orig_account['amount']}, cantidad solicitada: {amount}")
             
-            # Actualizar saldos
+            # Actualizar saldos (cada cuenta en su moneda)
             orig_account['amount'] = new_orig_balance
-            dest_account['amount'] = float(dest_account['amount']) + amount
+            dest_account['amount'] = float(dest_account['amount']) + amounts.for_account(movement, destination)
         
         # Guardar las cuentas actualizadas
-        self.accounts_repo.save(user, accounts)
+        self.save_accounts(user, accounts)
     
     def revert_account_balances(self, user: dict, movement: dict) -> None:
         """
@@ -142,9 +776,9 @@ class RusticDatabase:
         Raises:
             ValueError: Si una cuenta requerida no existe o la reversión causaría saldo negativo
         """
-        accounts = self.accounts_repo.list(user)
+        accounts = self.read_accounts(user)
+        amounts = MovementAmounts(self.fx, accounts)
         movement_type = movement.get('type', '')
-        amount = float(movement.get('amount', 0))
         origin = movement.get('origin', '')
         destination = movement.get('destination', '')
         
@@ -163,6 +797,7 @@ class RusticDatabase:
                 if not dest_account:
                     raise ValueError(f"Cuenta destino '{destination}' no encontrada")
                 
+                amount = amounts.for_account(movement, destination)
                 new_balance = float(dest_account['amount']) - amount
                 if new_balance < 0:
                     raise ValueError(f"No se puede revertir: saldo insuficiente en cuenta '{destination}'. Saldo actual: {dest_account['amount']}, cantidad a revertir: {amount}")
@@ -176,7 +811,7 @@ class RusticDatabase:
                 if not orig_account:
                     raise ValueError(f"Cuenta origen '{origin}' no encontrada")
                 
-                orig_account['amount'] = float(orig_account['amount']) + amount
+                orig_account['amount'] = float(orig_account['amount']) + amounts.for_account(movement, origin)
                 
         elif movement_type in ['Transferencia', 'Inversión']:
             # Para transferencias e inversiones, revertir significa:
@@ -195,13 +830,14 @@ class RusticDatabase:
                 raise ValueError(f"Cuenta destino '{destination}' no encontrada")
             
             # Verificar que se puede revertir (que destino tenga suficiente saldo)
+            amount = amounts.for_account(movement, destination)
             new_dest_balance = float(dest_account['amount']) - amount
             if new_dest_balance < 0:
                 raise ValueError(f"No se puede revertir: saldo insuficiente en cuenta destino '{destination}'. Saldo actual: {dest_account['amount']}, cantidad a revertir: {amount}")
             
             # Actualizar saldos (operaciones inversas)
-            orig_account['amount'] = float(orig_account['amount']) + amount  # Devolver dinero al origen
+            orig_account['amount'] = float(orig_account['amount']) + amounts.for_account(movement, origin)  # Devolver dinero al origen
             dest_account['amount'] = new_dest_balance  # Quitar dinero del destino
         
         # Guardar las cuentas actualizadas
-        self.accounts_repo.save(user, accounts)
\ No newline at end of file
+        self.save_accounts(user, accounts)
\ No newline at end of file
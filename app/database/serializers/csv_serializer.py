@@ -1,46 +1,91 @@
 import csv
+import gzip
+import lzma
 from .interfaces import CsvSerializer
 
+# Compresión transparente según la extensión del fichero
+COMPRESSED_OPENERS = {".gz": gzip.open, ".xz": lzma.open}
+
+def open_csv(path: str, mode: str):
+    """Abre un CSV en modo texto, descomprimiendo si es ``.gz`` o ``.xz``."""
+    for extension, opener in COMPRESSED_OPENERS.items():
+        if path.endswith(extension):
+            return opener(path, mode + "t", newline="", encoding="utf-8")
+    return open(path, mode, newline="", encoding="utf-8")
+
 class StdCsvSerializer(CsvSerializer):
     def load(self, path: str):
-        with open(path, newline="", encoding="utf-8") as f:
-            rows = list(csv.DictReader(f))
-            for row in rows:
+        return list(self.iter_load(path))
+
+    def iter_load(self, path: str):
+        # Rows are parsed one at a time: memory stays flat regardless of file size
+        with open_csv(path, "r") as f:
+            for row in csv.DictReader(f):
                 if 'tags' in row and row['tags']:
                     row['tags'] = row['tags'].split('#')
                 elif 'tags' in row:
                     row['tags'] = []
-            return rows
+                yield row
+
+    def count(self, path: str) -> int:
+        # csv.reader (not line count) so quoted newlines are handled; no dicts are built.
+        # Blank rows are skipped, as DictReader does in iter_load
+        with open_csv(path, "r") as f:
+            reader = csv.reader(f)
+            if next(reader, None) is None:
+                return 0
+            return sum(1 for row in reader if row)
 
     def dump(self, rows: list, path: str):
         # Read original headers from file if it exists
-        original_fieldnames = []
-        try:
-            with open(path, "r", newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                original_fieldnames = reader.fieldnames or []
-        except FileNotFoundError:
-            pass
+        original_fieldnames = self._read_fieldnames(path)
         
         if not rows:
             # If no rows, just write the header
-            with open(path, "w", newline="", encoding="utf-8") as f:
+            with open_csv(path, "w") as f:
                 writer = csv.DictWriter(f, fieldnames=original_fieldnames)
                 writer.writeheader()
             return
             
         # Create a copy of rows to avoid modifying the original data
-        processed_rows = []
-        for row in rows:
-            processed_row = row.copy()
-            if 'tags' in processed_row and isinstance(processed_row['tags'], list):
-                processed_row['tags'] = '#'.join(processed_row['tags'])
-            processed_rows.append(processed_row)
+        processed_rows = [self._process_row(row) for row in rows]
         
-        # Use original fieldnames if available, otherwise use keys from first row
-        fieldnames = original_fieldnames if original_fieldnames else list(processed_rows[0].keys())
+        # Use original fieldnames if available, otherwise use keys from first row,
+        # adding any new column present in the rows
+        fieldnames = list(original_fieldnames) if original_fieldnames else list(processed_rows[0].keys())
+        for row in processed_rows:
+            fieldnames.extend(key for key in row if key not in fieldnames)
         
-        with open(path, "w", newline="", encoding="utf-8") as f:
+        with open_csv(path, "w") as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
-            writer.writerows(processed_rows)
\ No newline at end of file
+            writer.writerows(processed_rows)
+
+    def append(self, row: dict, path: str):
+        fieldnames = self._read_fieldnames(path)
+        if not fieldnames or any(key not in fieldnames for key in row):
+            # New file or new columns: the header must be rewritten
+            try:
+                rows = self.load(path)
+            except FileNotFoundError:
+                rows = []
+            self.dump(rows + [row], path)
+            return
+
+        with open_csv(path, "a") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writerow(self._process_row(row))
+
+    def _read_fieldnames(self, path: str) -> list:
+        try:
+            with open_csv(path, "r") as f:
+                reader = csv.DictReader(f)
+                return reader.fieldnames or []
+        except FileNotFoundError:
+            return []
+
+    def _process_row(self, row: dict) -> dict:
+        processed_row = row.copy()
+        if 'tags' in processed_row and isinstance(processed_row['tags'], list):
+            processed_row['tags'] = '#'.join(processed_row['tags'])
+        return processed_row
@@ -1,6 +1,6 @@
 # serializers/interfaces.py
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Iterator
 
 class JsonSerializer(ABC):
     @abstractmethod
@@ -16,6 +16,18 @@ class CsvSerializer(ABC):
     def load(self, path: str)-> list[dict[str | Any, str | Any]]:
         pass
 
+    @abstractmethod
+    def iter_load(self, path: str) -> Iterator[dict[str | Any, str | Any]]:
+        pass
+
+    @abstractmethod
+    def count(self, path: str) -> int:
+        pass
+
     @abstractmethod
     def dump(self, rows: list, path: str) :
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def append(self, row: dict, path: str) :
+        pass
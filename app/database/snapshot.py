@@ -0,0 +1,89 @@
+# snapshot.py
+import hashlib
+import logging
+import os
+import pickle
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+# Versión del formato: una instantánea de otro formato se ignora
+SNAPSHOT_FORMAT = 2
+
+# Campos de cada usuario guardado en ``views``
+VIEW_FIELDS = ('version', 'mtimes', 'accounts', 'movements', 'derived')
+
+# Raíz del paquete ``app``: su código determina qué objetos contiene la instantánea
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    Huella del código fuente de ``app``. La instantánea guarda objetos
+    (índices, series...) cuyas clases pueden cambiar en cada despliegue, así
+    que solo se carga si la generó exactamente el mismo código.
+    """
+    digest = hashlib.sha1()
+    for root, dirs, files in os.walk(APP_ROOT):
+        dirs[:] = sorted(d for d in dirs if d not in ("__pycache__", "data"))
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, APP_ROOT).encode("utf-8"))
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def file_mtimes(folder: str) -> Dict[str, int]:
+    """Fecha de modificación (ns) de cada fichero bajo ``folder``, por ruta relativa."""
+    mtimes = {}
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                mtimes[os.path.relpath(path, folder)] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                # Borrado mientras se recorría: la comparación posterior lo detectará
+                continue
+    return mtimes
+
+
+def write_snapshot(path: str, data: Dict[str, Any]) -> None:
+    """Escribe la instantánea de forma atómica (los workers nunca leen una a medias)."""
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        pickle.dump({'format': SNAPSHOT_FORMAT, 'code': code_version(), **data}, f,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Lee la instantánea o devuelve None si no existe, está dañada o la generó
+    otro formato u otra versión del código: un fichero de caché nunca debe
+    impedir que arranque un worker.
+
+    Solo debe apuntar a ficheros generados por ``snapshot.py`` dentro del
+    directorio de datos: pickle no es seguro con ficheros de terceros.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # Fichero truncado, clases que ya no coinciden, permisos, falta de memoria...
+        logger.warning("Ignoring unreadable snapshot %s: %r", path, e)
+        return None
+    if not isinstance(data, dict) or data.get('format') != SNAPSHOT_FORMAT:
+        logger.warning("Ignoring snapshot %s: unknown format", path)
+        return None
+    if data.get('code') != code_version():
+        logger.warning("Ignoring snapshot %s: generated by a different code version", path)
+        return None
+    return data
@@ -0,0 +1,52 @@
+# user_view.py
+from typing import Any, Dict, List, Optional
+
+
+class UserView:
+    """
+    Copia en memoria de los datos de un usuario, válida para una generación
+    concreta de la ``VersionTable``.
+
+    Las cuentas y los movimientos se cargan bajo demanda. ``derived`` guarda
+    estructuras calculadas a partir de los movimientos (índices, series...)
+    que se descartan junto con la vista cuando otro proceso escribe.
+
+    Cuando la escritura la hace este mismo proceso, cada estructura derivada
+    puede actualizarse de forma incremental implementando ``on_insert`` u
+    ``on_delete`` (y ``on_accounts_changed`` si depende de los saldos); si no
+    los implementa, o devuelven False, se descarta y se recalculará. Un
+    hook que falla también la descarta: la escritura ya está guardada y no
+    debe interrumpirse por una estructura en memoria.
+    """
+
+    def __init__(self, version: int):
+        self.version = version
+        self.accounts: Optional[List[Dict[str, Any]]] = None
+        self.movements: Optional[List[Dict[str, Any]]] = None
+        self.derived: Dict[str, Any] = {}
+
+    def movement_inserted(self, index: int, movement: Dict[str, Any]) -> None:
+        self._notify('on_insert', index, movement)
+
+    def movement_deleted(self, index: int, movement: Dict[str, Any]) -> None:
+        self._notify('on_delete', index, movement)
+
+    def accounts_changed(self, accounts: List[Dict[str, Any]]) -> None:
+        # Solo afecta a las estructuras que dependen de los saldos
+        for name, item in list(self.derived.items()):
+            handler = getattr(item, 'on_accounts_changed', None)
+            if handler is not None and self._call(handler, accounts) is False:
+                del self.derived[name]
+
+    def _notify(self, hook: str, *args) -> None:
+        for name, item in list(self.derived.items()):
+            handler = getattr(item, hook, None)
+            if handler is None or self._call(handler, *args) is False:
+                del self.derived[name]
+
+    @staticmethod
+    def _call(handler, *args) -> bool:
+        try:
+            return handler(*args)
+        except Exception:
+            return False
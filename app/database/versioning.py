@@ -0,0 +1,72 @@
+# versioning.py
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se serializan los hilos del propio proceso
+    fcntl = None
+
+
+class VersionTable:
+    """
+    Tabla de generaciones compartida entre procesos.
+
+    Cada clave (``users`` para ``users.json`` y ``user-<nombre>`` para los
+    ficheros de un usuario) tiene un contador en ``<base_path>/.versions/<clave>``.
+    Los escritores lo incrementan después de persistir sus cambios; los lectores
+    solo tienen que leer ese número para saber si su copia en memoria sigue
+    vigente, sin volver a leer ni hacer ``stat`` de los ficheros de datos.
+    """
+
+    def __init__(self, base_path: str):
+        self.path = os.path.join(base_path, ".versions")
+        os.makedirs(self.path, exist_ok=True)
+        self._thread_lock = threading.Lock()
+
+    def current(self, key: str) -> int:
+        """Devuelve la generación actual de una clave (0 si nunca se escribió)."""
+        try:
+            with open(self._file(key), "r", encoding="utf-8") as f:
+                data = f.read().strip()
+        except FileNotFoundError:
+            return 0
+        return int(data) if data else 0
+
+    def bump(self, key: str, on_bump: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Incrementa la generación de una clave y devuelve el nuevo valor.
+
+        ``on_bump`` se ejecuta con la nueva generación sin soltar el bloqueo,
+        así que ningún otro escritor puede publicar la siguiente hasta que
+        termine (p. ej. hasta que la escritura quede en el registro de cambios).
+        """
+        path = self._file(key)
+        with self._locked(key):
+            version = self.current(key) + 1
+            # Escritura atómica: los lectores nunca ven un fichero a medias
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(str(version))
+            os.replace(tmp_path, path)
+            if on_bump is not None:
+                on_bump(version)
+        return version
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key)
+
+    @contextmanager
+    def _locked(self, key: str):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._file(key) + ".lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
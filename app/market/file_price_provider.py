@@ -0,0 +1,22 @@
+import os
+from typing import Dict, List
+from .interfaces import PriceProvider
+from app.database.serializers.json_serializer import JsonSerializer
+
+class FilePriceProvider(PriceProvider):
+    """
+    Proveedor de precios local para uso sin conexión.
+
+    Lee un JSON ``{"SIMBOLO": precio}`` en cada consulta, de modo que basta
+    con editar el fichero para simular movimientos del mercado.
+    """
+
+    def __init__(self, path: str, serializer: JsonSerializer):
+        self.path = path
+        self.serializer = serializer
+
+    def fetch(self, symbols: List[str]) -> Dict[str, float]:
+        if not os.path.exists(self.path):
+            return {}
+        prices = self.serializer.load(self.path)
+        return {s: float(prices[s]) for s in symbols if s in prices}
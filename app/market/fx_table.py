@@ -0,0 +1,147 @@
+# fx_table.py
+import threading
+from array import array
+from bisect import bisect_right
+from operator import mul
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.database.repositories.interfaces import FxRateRepository
+
+# Fecha usada cuando un importe no tiene fecha: se aplica el último tipo conocido
+LATEST = "9999-12-31"
+
+
+class FxTable:
+    """
+    Tipos de cambio respecto a la moneda base.
+
+    Cada divisa guarda sus fechas ordenadas y sus tipos en columnas, de modo
+    que el tipo vigente en una fecha es una búsqueda binaria. Los tipos ya
+    resueltos por ``(divisa, fecha)`` se cachean, y la tabla se recarga sola
+    cuando cambia el fichero.
+    """
+
+    def __init__(self, repo: FxRateRepository, base_currency: str):
+        self.repo = repo
+        self.base_currency = base_currency.upper()
+        self._lock = threading.Lock()
+        self._version = None
+        self._series: Dict[str, Tuple[List[str], array]] = {}
+        self._cache: Dict[Tuple[str, str], float] = {}
+
+    def currencies(self) -> List[str]:
+        self._refresh()
+        return sorted({self.base_currency, *self._series})
+
+    def rate(self, currency: str, date: Optional[str] = None) -> float:
+        """
+        Valor de una unidad de ``currency`` en la moneda base en ``date``.
+
+        Raises:
+            ValueError: Si no hay tipo para la divisa en esa fecha
+        """
+        currency = currency.upper()
+        if currency == self.base_currency:
+            return 1.0
+        self._refresh()
+        key = (currency, date or LATEST)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        dates, rates = self._series.get(currency, ([], array('d')))
+        position = bisect_right(dates, key[1]) - 1
+        if position < 0:
+            raise ValueError(f"No FX rate for {currency} on {key[1]}")
+        self._cache[key] = rates[position]
+        return rates[position]
+
+    def convert(self, amount: float, currency: str, date: Optional[str] = None,
+                target: Optional[str] = None) -> float:
+        return self.convert_many([amount], [currency], [date], target)[0]
+
+    def convert_many(self, amounts: Iterable[float], currencies: Iterable[str],
+                     dates: Iterable[Optional[str]], target: Optional[str] = None) -> array:
+        """
+        Convierte una columna de importes a ``target`` (por defecto la moneda base).
+
+        Se busca un solo factor por cada par ``(divisa, fecha)`` distinto y
+        después se multiplican las columnas de importes y factores.
+        """
+        target = (target or self.base_currency).upper()
+        pairs = list(zip((c.upper() for c in currencies), dates))
+        factors: Dict[Tuple[str, Optional[str]], float] = {}
+        for currency, date in set(pairs):
+            factor = 1.0 if currency == target else self.rate(currency, date) / self.rate(target, date)
+            factors[(currency, date)] = factor
+        return array('d', map(mul, array('d', amounts), (factors[pair] for pair in pairs)))
+
+    def _refresh(self) -> None:
+        version = self.repo.version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            rows: Dict[str, List[Tuple[str, float]]] = {}
+            for row in self.repo.list():
+                rows.setdefault(row['currency'].upper(), []).append((row['date'], float(row['rate'])))
+            series = {}
+            for currency, points in rows.items():
+                points.sort()
+                series[currency] = ([d for d, _ in points], array('d', (r for _, r in points)))
+            self._series = series
+            self._cache = {}
+            self._version = version
+
+
+class MovementAmounts:
+    """
+    Importes de movimientos en la moneda de cada cuenta.
+
+    Es la única regla de monedas de los movimientos: un movimiento con
+    ``currency`` está en esa moneda; si no, en la de la cuenta que paga (la
+    de origen, o la de destino en los ingresos). La usan los saldos, los
+    totales y las estructuras derivadas para que todos coincidan.
+    """
+
+    def __init__(self, fx: FxTable, accounts: List[Dict[str, Any]]):
+        self.fx = fx
+        self.update(accounts)
+
+    @property
+    def base_currency(self) -> str:
+        return self.fx.base_currency
+
+    def update(self, accounts: List[Dict[str, Any]]) -> None:
+        """Recoge las monedas de las cuentas (tras dar de alta alguna)."""
+        self._currencies = {a['name']: (a.get('currency') or self.fx.base_currency).upper() for a in accounts}
+
+    def account_currency(self, account_name: Optional[str]) -> str:
+        return self._currencies.get(account_name, self.fx.base_currency)
+
+    def currency(self, movement: Dict[str, Any]) -> str:
+        """Moneda en la que está expresado el importe del movimiento."""
+        if movement.get('currency'):
+            return movement['currency'].upper()
+        payer = movement.get('destination') if movement.get('type') == 'Ingreso' else movement.get('origin')
+        return self.account_currency(payer)
+
+    def to(self, movement: Dict[str, Any], currency: str) -> float:
+        """
+        Importe del movimiento en ``currency`` con el tipo de cambio de su fecha.
+
+        Raises:
+            ValueError: Si falta el tipo de cambio
+        """
+        try:
+            amount = float(movement.get('amount') or 0)
+        except (TypeError, ValueError):
+            amount = 0.0
+        source = self.currency(movement)
+        if source == currency.upper():
+            return amount
+        return self.fx.convert(amount, source, movement.get('date') or None, currency)
+
+    def for_account(self, movement: Dict[str, Any], account_name: str) -> float:
+        """Importe del movimiento en la moneda de la cuenta ``account_name``."""
+        return self.to(movement, self.account_currency(account_name))
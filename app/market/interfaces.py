@@ -0,0 +1,9 @@
+# market/interfaces.py
+from abc import ABC, abstractmethod
+from typing import Dict, List
+
+class PriceProvider(ABC):
+    @abstractmethod
+    def fetch(self, symbols: List[str]) -> Dict[str, float]:
+        """Devuelve el último precio de cada símbolo conocido (los desconocidos se omiten)."""
+        pass
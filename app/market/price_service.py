@@ -0,0 +1,119 @@
+# price_service.py
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+from .interfaces import PriceProvider
+from app.database.repositories.interfaces import PriceHistoryRepository
+
+
+class PriceService:
+    """
+    Precios de mercado con caché, agrupación de peticiones e histórico.
+
+    - Un precio con menos de ``ttl`` segundos se sirve directamente.
+    - Entre ``ttl`` y ``ttl + stale_ttl`` se sirve el valor antiguo y se
+      refresca en segundo plano (stale-while-revalidate).
+    - Más allá hay que consultar al proveedor antes de responder.
+
+    Todas las consultas pendientes se resuelven con una única llamada al
+    proveedor por lote, y si otra petición ya está consultando un símbolo se
+    espera a su resultado en lugar de repetir la llamada.
+    """
+
+    def __init__(self, provider: PriceProvider, history_repo: Optional[PriceHistoryRepository] = None,
+                 ttl: float = 300, stale_ttl: float = 3600):
+        self.provider = provider
+        self.history_repo = history_repo
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._cache: Dict[str, tuple] = {}                  # símbolo -> (precio o None, timestamp)
+        self._inflight: Dict[str, threading.Event] = {}     # símbolo -> consulta en curso
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Cotización de un símbolo o None si el proveedor no lo conoce."""
+        return self.get_many([symbol]).get(symbol)
+
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Cotizaciones de varios símbolos con una sola consulta al proveedor.
+
+        Returns:
+            {símbolo: {"price", "fetchedAt", "stale"}} para los símbolos conocidos
+        """
+        symbols = list(dict.fromkeys(symbols))
+        now = time.time()
+        missing, stale = [], []
+        with self._lock:
+            for symbol in symbols:
+                cached = self._cache.get(symbol)
+                age = now - cached[1] if cached else None
+                if age is None or age >= self.ttl + self.stale_ttl:
+                    missing.append(symbol)
+                elif age >= self.ttl and symbol not in self._inflight:
+                    # Se reserva ya el refresco: otras peticiones no lanzan el suyo
+                    self._inflight[symbol] = threading.Event()
+                    stale.append(symbol)
+
+        if missing:
+            self._fetch(missing)
+        if stale:
+            # Servir el valor antiguo y refrescarlo sin bloquear la petición
+            threading.Thread(target=self._fetch_claimed, args=(stale, False), daemon=True).start()
+
+        result = {}
+        with self._lock:
+            for symbol in symbols:
+                cached = self._cache.get(symbol)
+                if cached and cached[0] is not None:
+                    result[symbol] = {
+                        'price': cached[0],
+                        'fetchedAt': cached[1],
+                        'stale': now - cached[1] >= self.ttl,
+                    }
+        return result
+
+    def history(self, symbol: str) -> List[Dict[str, Any]]:
+        """Histórico diario persistido de un símbolo."""
+        if self.history_repo is None:
+            return []
+        return self.history_repo.list(symbol)
+
+    def _fetch(self, symbols: List[str], raise_errors: bool = True) -> None:
+        """Consulta al proveedor los símbolos que nadie esté consultando ya y espera al resto."""
+        claimed, waiting = [], []
+        with self._lock:
+            for symbol in symbols:
+                event = self._inflight.get(symbol)
+                if event is None:
+                    self._inflight[symbol] = threading.Event()
+                    claimed.append(symbol)
+                else:
+                    waiting.append(event)
+
+        self._fetch_claimed(claimed, raise_errors)
+        for event in waiting:
+            event.wait()
+
+    def _fetch_claimed(self, claimed: List[str], raise_errors: bool = True) -> None:
+        """Consulta al proveedor símbolos ya reservados en ``_inflight`` y libera la reserva."""
+        try:
+            if claimed:
+                prices = self.provider.fetch(claimed)
+                fetched_at = time.time()
+                with self._lock:
+                    # Los símbolos desconocidos también se cachean para no repetir la consulta
+                    for symbol in claimed:
+                        self._cache[symbol] = (prices.get(symbol), fetched_at)
+                if self.history_repo is not None:
+                    today = date.today().isoformat()
+                    for symbol, price in prices.items():
+                        self.history_repo.record(symbol, today, price)
+        except Exception:
+            if raise_errors:
+                raise
+        finally:
+            with self._lock:
+                for symbol in claimed:
+                    self._inflight.pop(symbol).set()
@@ -1,3 +1,8 @@
 from .auth import auth_bp
 from .accounts import accounts_bp
-from .movements import movements_bp
\ No newline at end of file
+from .movements import movements_bp
+from .events import events_bp
+from .sync import sync_bp
+from .prices import prices_bp
+from .investments import investments_bp
+from .budgets import budgets_bp
@@ -8,6 +8,8 @@
 """
 
 from flask import Blueprint, request, jsonify, current_app
+from datetime import datetime
+from app.analytics.balance_history import history_factory, downsample
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURACIÓN DEL BLUEPRINT
@@ -46,12 +48,52 @@ def accounts():
         return jsonify({'error': 'User not found'}), 404
     
     # Obtener lista de cuentas del usuario
-    accounts = current_app.config['DATABASE'].accounts_repo.list(user)
+    accounts = current_app.config['DATABASE'].read_accounts(user)
     
     # Retornar el número total de cuentas
     return jsonify({'numberOfAccounts': len(accounts)})
 
 
+@accounts_bp.get('/totals')
+def account_totals():
+    """
+    Obtener el saldo total de todas las cuentas en una misma moneda
+    
+    Cada cuenta se convierte desde su moneda con el último tipo de cambio
+    conocido; la conversión se hace en bloque con un único tipo por moneda.
+    
+    Query Params:
+        currency (str, opcional): Moneda del total (por defecto la moneda base)
+        
+    Returns:
+        JSON: {"currency", "total", "accounts": [{"name", "currency", "amount", "converted"}]}
+        400: Si la moneda no es válida o falta algún tipo de cambio
+        401: Si no hay sesión activa
+        404: Si el usuario no existe
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
+    
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
+    
+    # Buscar usuario en la base de datos
+    database = current_app.config['DATABASE']
+    user = database.read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    currency = request.args.get('currency', database.fx.base_currency).upper()
+    if currency not in database.fx.currencies():
+        return jsonify({'error': f'Unknown currency: {currency}'}), 400
+    
+    try:
+        return jsonify(database.account_totals(user, currency))
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+
+
 @accounts_bp.get('/<int:account_id>')
 def account_detail(account_id):
     """
@@ -81,7 +123,7 @@ def account_detail(account_id):
         return jsonify({'error': 'User not found'}), 404
     
     # Obtener lista de cuentas del usuario
-    accounts = current_app.config['DATABASE'].accounts_repo.list(user)
+    accounts = current_app.config['DATABASE'].read_accounts(user)
     
     # Validar que el índice de cuenta sea válido
     if account_id < 0 or account_id >= len(accounts):
@@ -91,6 +133,75 @@ def account_detail(account_id):
     return jsonify(accounts[account_id])
 
 
+@accounts_bp.get('/<int:account_id>/history')
+def account_history(account_id):
+    """
+    Obtener la evolución del saldo de una cuenta
+    
+    Calcula el saldo tras cada movimiento de la cuenta a partir de la suma
+    acumulada de sus movimientos, anclada en el saldo actual. La serie se
+    cachea y se extiende al añadir movimientos nuevos.
+    
+    Args:
+        account_id (int): Índice de la cuenta en la lista del usuario
+        
+    Query Params:
+        from (str): Fecha inicial YYYY-MM-DD (incluye el saldo de apertura)
+        to (str): Fecha final YYYY-MM-DD
+        points (int): Número máximo de puntos (submuestreo LTTB)
+        
+    Returns:
+        JSON: {"account", "history": [{"date", "balance"}]}
+        400: Si las fechas o el número de puntos no son válidos, o falta algún tipo de cambio
+        401: Si no hay sesión activa
+        404: Si el usuario o la cuenta no existen
+        500: Si hay error al calcular la serie
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
+    
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
+    
+    # Buscar usuario en la base de datos
+    database = current_app.config['DATABASE']
+    user = database.read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    # Validar que el índice de cuenta sea válido
+    accounts = database.read_accounts(user)
+    if account_id < 0 or account_id >= len(accounts):
+        return jsonify({'error': 'Account not found'}), 404
+    
+    # Validar parámetros de consulta
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    for value in (date_from, date_to):
+        if value is not None:
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+    points = request.args.get('points', type=int)
+    if 'points' in request.args and (points is None or points < 3):
+        return jsonify({'error': 'points must be an integer greater than 2'}), 400
+    
+    # Serie cacheada por versión de los datos del usuario
+    account_name = accounts[account_id]['name']
+    try:
+        history = database.derived(user, f'history:{account_name}', history_factory(account_name, database.fx))
+        series = history.series(date_from, date_to)
+        if points:
+            series = downsample(series, points)
+        return jsonify({'account': account_name, 'history': series})
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Error computing balance history: {str(e)}'}), 500
+
+
 @accounts_bp.post('')
 def create_account():
     """
@@ -103,7 +214,8 @@ def create_account():
         {
             "account": {
                 "name": "Nombre de la cuenta",
-                "amount": 1000.50
+                "amount": 1000.50,
+                "currency": "USD"          # Opcional: por defecto la moneda base
             }
         }
         
@@ -154,18 +266,26 @@ def create_account():
     if not isinstance(account_data['name'], str) or not isinstance(account_data['amount'], (int, float)):
         return jsonify({'error': 'Name must be string and amount must be number'}), 400
     
+    # Validar la moneda: debe ser la base o tener tipos de cambio
+    if 'currency' in account_data:
+        if not isinstance(account_data['currency'], str):
+            return jsonify({'error': 'Currency must be a string'}), 400
+        account_data['currency'] = account_data['currency'].upper()
+        if account_data['currency'] not in current_app.config['DATABASE'].fx.currencies():
+            return jsonify({'error': f"Unknown currency: {account_data['currency']}"}), 400
+    
     # ──────────────────────────────────────────────────────────────────────────
     # CREACIÓN Y PERSISTENCIA DE LA CUENTA
     # ──────────────────────────────────────────────────────────────────────────
     
     # Obtener lista actual de cuentas del usuario
-    accounts = current_app.config['DATABASE'].accounts_repo.list(user)
+    accounts = current_app.config['DATABASE'].read_accounts(user)
     
     # Agregar la nueva cuenta a la lista existente
     accounts.append(account_data)
     
     # Guardar la lista actualizada en la base de datos
-    current_app.config['DATABASE'].accounts_repo.save(user, accounts)
+    current_app.config['DATABASE'].save_accounts(user, accounts)
     
     # Retornar confirmación de creación exitosa
     return jsonify({'message': 'Account created successfully'}), 201
\ No newline at end of file
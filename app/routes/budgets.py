@@ -0,0 +1,148 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                           RUTAS DE PRESUPUESTOS                              ║
+║                                                                              ║
+║  Este módulo gestiona los límites de gasto mensuales por etiqueta o por      ║
+║  cuenta y su consumo, que se mantiene al registrar cada movimiento.          ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+"""
+
+from flask import Blueprint, request, jsonify, current_app
+from datetime import date, datetime
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN DEL BLUEPRINT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+budgets_bp = Blueprint('budgets', __name__)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENDPOINTS DE PRESUPUESTOS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@budgets_bp.get('')
+def list_budgets():
+    """
+    Obtener el consumo de los presupuestos en un mes
+
+    El consumo se lee del estado acumulado del usuario, sin recorrer los
+    movimientos, así que el coste solo depende del número de presupuestos.
+
+    Query Params:
+        month (str, opcional): Mes en formato YYYY-MM (por defecto el actual)
+
+    Returns:
+        JSON: {"month", "budgets": [{"name", "tag"|"account", "limit", "spent", "remaining", "ratio"}]}
+        400: Si el mes no es válido
+        401: Si no hay sesión activa
+        404: Si el usuario no existe
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
+
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
+
+    # Buscar usuario en la base de datos
+    user = current_app.config['DATABASE'].read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    month = request.args.get('month', date.today().strftime('%Y-%m'))
+    try:
+        datetime.strptime(month, '%Y-%m')
+    except ValueError:
+        return jsonify({'error': 'Month must be in YYYY-MM format'}), 400
+
+    return jsonify({'month': month, 'budgets': current_app.config['DATABASE'].read_budgets(user, month)})
+
+
+@budgets_bp.post('')
+def save_budget():
+    """
+    Crear o sustituir un presupuesto
+
+    Un presupuesto limita el gasto mensual de una etiqueta o de una cuenta de
+    origen. Si ya existe uno con el mismo nombre se reemplaza.
+
+    Request Body:
+        {
+            "budget": {
+                "name": "Comida",
+                "tag": "comida",          # o bien "account": "Banco"
+                "limit": 300,
+                "currency": "EUR"         # Opcional: moneda del límite (por defecto la base)
+            }
+        }
+
+    Returns:
+        JSON: Mensaje de confirmación
+        400: Si los datos son inválidos o están incompletos
+        401: Si no hay sesión activa
+        404: Si el usuario o la cuenta no existen
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
+
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
+
+    # Buscar usuario en la base de datos
+    database = current_app.config['DATABASE']
+    user = database.read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    # ──────────────────────────────────────────────────────────────────────────
+    # VALIDACIÓN DE DATOS DE ENTRADA
+    # ──────────────────────────────────────────────────────────────────────────
+
+    # Verificar que la petición contenga JSON válido
+    if not request.is_json:
+        return jsonify({'error': 'Request must be JSON'}), 400
+
+    data = request.get_json()
+    if not data or not isinstance(data.get('budget'), dict):
+        return jsonify({'error': 'Missing budget data'}), 400
+    budget_data = data['budget']
+
+    # Validar nombre y límite
+    if not isinstance(budget_data.get('name'), str) or not budget_data['name'].strip():
+        return jsonify({'error': 'Budget must have a name'}), 400
+    limit = budget_data.get('limit')
+    if isinstance(limit, bool) or not isinstance(limit, (int, float)) or limit <= 0:
+        return jsonify({'error': 'Limit must be a positive number'}), 400
+
+    # Exactamente uno de etiqueta o cuenta
+    tag = budget_data.get('tag')
+    account = budget_data.get('account')
+    if bool(tag) == bool(account):
+        return jsonify({'error': 'Budget must have either a tag or an account'}), 400
+    if not isinstance(tag or account, str):
+        return jsonify({'error': 'Tag and account must be strings'}), 400
+    if account and all(a['name'] != account for a in database.read_accounts(user)):
+        return jsonify({'error': f'Account {account} not found'}), 404
+
+    # Moneda del límite: los gastos se convierten a ella al consumir el presupuesto
+    currency = budget_data.get('currency')
+    if currency is not None:
+        if not isinstance(currency, str) or currency.upper() not in database.fx.currencies():
+            return jsonify({'error': f'Unknown currency: {currency}'}), 400
+        currency = currency.upper()
+
+    budget = {'name': budget_data['name'].strip(), 'limit': limit}
+    budget['tag' if tag else 'account'] = tag or account
+    if currency:
+        budget['currency'] = currency
+
+    try:
+        database.save_budget(user, budget)
+        return jsonify({'message': 'Budget saved successfully'}), 201
+    except ValueError as ve:
+        # Falta el tipo de cambio de algún gasto en otra moneda
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Error saving budget: {str(e)}'}), 500
@@ -0,0 +1,127 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                             RUTAS DE EVENTOS                                 ║
+║                                                                              ║
+║  Este módulo expone un stream Server-Sent Events con los cambios de los      ║
+║  datos del usuario, para que los clientes apliquen deltas en lugar de        ║
+║  recargar listas completas.                                                  ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+"""
+
+import json
+from flask import Blueprint, Response, request, jsonify, current_app
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN DEL BLUEPRINT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+events_bp = Blueprint('events', __name__)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENDPOINTS DE EVENTOS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def format_event(entry: dict) -> str:
+    """Serializa un cambio del registro como evento SSE."""
+    event_id = f"id: {entry['seq']}\n" if entry['seq'] is not None else ""
+    return f"{event_id}event: {entry['type']}\ndata: {json.dumps(entry)}\n\n"
+
+
+@events_bp.get('')
+def events():
+    """
+    Suscribirse a los cambios del usuario mediante Server-Sent Events
+
+    Mantiene abierta la conexión y envía un evento por cada cambio en los
+    datos del usuario autenticado, con la secuencia del cambio como id:
+    - movement_created: {index, movement}
+    - movement_deleted: {index}
+    - account_created: {index, account}
+    - account_balance_changed: {index, name, amount}
+    - resync: el cliente se ha quedado atrás y debe recargar sus listas
+
+    Al reconectar, el navegador envía la cabecera Last-Event-ID y se reenvían
+    los cambios perdidos desde el registro de cambios. Ese mismo registro
+    permite entregar los cambios escritos por otros workers.
+
+    Query Params:
+        since (int): Secuencia desde la que emitir, si no hay Last-Event-ID
+
+    Returns:
+        text/event-stream: Stream de eventos del usuario
+        400: Si la secuencia no es un entero
+        401: Si no hay sesión activa
+        404: Si el usuario no existe
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
+
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
+
+    # Buscar usuario en la base de datos
+    database = current_app.config['DATABASE']
+    user = database.read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    # Punto de partida: último evento recibido por el cliente o el estado actual
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        last_seq = int(since) if since is not None else None
+    except ValueError:
+        return jsonify({'error': 'since must be an integer'}), 400
+
+    heartbeat = current_app.config['EVENTS_HEARTBEAT']
+
+    def replay(seq: int):
+        """Recupera del registro los cambios posteriores a ``seq``."""
+        delta = database.changes_since(user, seq)
+        if delta is None:
+            # El registro ya no cubre ese punto: el cliente debe recargar
+            return [{'seq': None, 'type': 'resync', 'data': {}}], database.current_seq(user)
+        seq, changes = delta
+        return changes, seq
+
+    def stream():
+        nonlocal last_seq
+        # Suscribirse al empezar a emitir, no antes: un cliente que se va antes
+        # del primer fragmento nunca arranca el generador y no deja cola. La
+        # suscripción va antes de leer la secuencia para no perder cambios.
+        subscription = database.feed.subscribe(user['name'])
+        try:
+            if last_seq is None:
+                last_seq = database.current_seq(user)
+            # Indicar al navegador cada cuánto reintentar si se corta la conexión
+            yield f"retry: {heartbeat * 1000}\n\n"
+            pending, last_seq = replay(last_seq)
+            for entry in pending:
+                yield format_event(entry)
+
+            while True:
+                item = subscription.get(timeout=heartbeat)
+                if item is None and database.current_seq(user) == last_seq:
+                    # Comentario SSE para mantener viva la conexión
+                    yield ": keepalive\n\n"
+                    continue
+                if item is None or item['seq'] is None or item['seq'] > last_seq + 1:
+                    # Cambios de otro worker, huecos o cola desbordada: leer del registro
+                    pending, last_seq = replay(last_seq)
+                elif item['seq'] == last_seq + 1:
+                    pending, last_seq = item['changes'], item['seq']
+                else:
+                    continue
+                for entry in pending:
+                    yield format_event(entry)
+                if not pending:
+                    yield ": keepalive\n\n"
+        finally:
+            # El cliente se ha desconectado: liberar su cola
+            database.feed.unsubscribe(subscription)
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
@@ -0,0 +1,79 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                           RUTAS DE INVERSIONES                               ║
+║                                                                              ║
+║  Este módulo expone la cartera de inversiones del usuario: posiciones por    ║
+║  cuenta, coste de adquisición, valor de mercado y plusvalías.                ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+"""
+
+from flask import Blueprint, request, jsonify, current_app
+from app.analytics.portfolio import COST_METHODS, portfolio_factory
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN DEL BLUEPRINT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+investments_bp = Blueprint('investments', __name__)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENDPOINTS DE INVERSIONES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@investments_bp.get('')
+def investments():
+    """
+    Obtener la cartera de inversiones valorada a precios de mercado
+
+    Las posiciones se derivan de los movimientos de tipo Inversión con
+    símbolo y cantidad, y se cachean hasta que cambian los movimientos. Los
+    precios de todos los símbolos se obtienen en una sola consulta.
+
+    Query Params:
+        method (str): Cálculo del coste, "fifo" (por defecto) o "average"
+
+    Returns:
+        JSON: {"positions": [...], "totals": {...}}
+        400: Si el método no es válido o falta algún tipo de cambio
+        401: Si no hay sesión activa
+        404: Si el usuario no existe
+        500: Si hay error al calcular la cartera
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
+    
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
+    
+    # Buscar usuario en la base de datos
+    database = current_app.config['DATABASE']
+    user = database.read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    method = request.args.get('method', 'fifo')
+    if method not in COST_METHODS:
+        return jsonify({'error': f'Invalid method. Must be one of: {list(COST_METHODS)}'}), 400
+
+    try:
+        # Posiciones cacheadas por versión de los datos del usuario
+        portfolio = database.derived(user, f'portfolio:{method}', portfolio_factory(method, database.fx))
+
+        # Una sola consulta de precios para todos los símbolos de la cartera
+        quotes = current_app.config['PRICES'].get_many(portfolio.symbols())
+        positions = portfolio.valuate({s: q['price'] for s, q in quotes.items()})
+
+        valued = [p for p in positions if p['marketValue'] is not None]
+        totals = {
+            'costBasis': sum(p['costBasis'] for p in positions),
+            'marketValue': sum(p['marketValue'] for p in valued),
+            'unrealizedGain': sum(p['unrealizedGain'] for p in valued),
+            'realizedGain': portfolio.realized_gain(),
+        }
+        return jsonify({'method': method, 'positions': positions, 'totals': totals})
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Error computing portfolio: {str(e)}'}), 500
@@ -9,6 +9,7 @@
 
 from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime
+from app.database.query import MovementQuery, SORT_KEYS
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURACIÓN DEL BLUEPRINT
@@ -19,6 +20,176 @@ movements_bp = Blueprint('movements', __name__)
 # Tipos de movimientos válidos basados en la interfaz del frontend (MovementsMenu.tsx)
 VALID_MOVEMENT_TYPES = ["Ingreso", "Gasto", "Transferencia", "Inversión"]
 
+# Máximo de resultados por página en la búsqueda de texto
+MAX_SEARCH_RESULTS = 100
+
+# Parámetros de GET /movements que activan la consulta en el servidor
+QUERY_PARAMS = ("type", "account", "minAmount", "maxAmount", "from", "to", "tags", "sort", "limit", "offset")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FUNCIONES AUXILIARES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def parse_number(args, name: str, cast):
+    """
+    Lee un parámetro numérico opcional de la URL.
+    
+    Raises:
+        ValueError: Si el parámetro no es un número válido
+    """
+    value = args.get(name)
+    if value is None:
+        return None
+    try:
+        return cast(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a number')
+
+
+def parse_movement_query(args) -> MovementQuery:
+    """
+    Construye la consulta de movimientos a partir de los parámetros de la URL.
+    
+    Raises:
+        ValueError: Si algún parámetro no es válido
+    """
+    def split(name):
+        value = args.get(name)
+        return [item.strip() for item in value.split(',') if item.strip()] if value else None
+    
+    types = split('type')
+    if types and any(t not in VALID_MOVEMENT_TYPES for t in types):
+        raise ValueError(f'Invalid type. Must be one of: {", ".join(VALID_MOVEMENT_TYPES)}')
+    
+    for name in ('from', 'to'):
+        if args.get(name) is not None:
+            try:
+                datetime.strptime(args[name], '%Y-%m-%d')
+            except ValueError:
+                raise ValueError('Dates must be in YYYY-MM-DD format')
+    
+    limit = parse_number(args, 'limit', int)
+    offset = parse_number(args, 'offset', int) or 0
+    if (limit is not None and limit < 1) or offset < 0:
+        raise ValueError('limit must be positive and offset non-negative')
+    
+    sort = args.get('sort', 'date')
+    descending = sort.startswith('-')
+    sort = sort.lstrip('-')
+    if sort not in SORT_KEYS:
+        raise ValueError(f'Invalid sort. Must be one of: {", ".join(SORT_KEYS)}')
+    
+    return MovementQuery(
+        types=types,
+        account=args.get('account') or None,
+        amount_min=parse_number(args, 'minAmount', float),
+        amount_max=parse_number(args, 'maxAmount', float),
+        date_from=args.get('from'),
+        date_to=args.get('to'),
+        tags=split('tags'),
+        sort=sort,
+        descending=descending,
+        limit=limit,
+        offset=offset,
+    )
+
+
+def validate_movement(movement_data: dict) -> str | None:
+    """
+    Valida los campos de un movimiento y normaliza los que lo requieren
+    (símbolo y moneda en mayúsculas).
+    
+    Returns:
+        El mensaje de error, o None si el movimiento es válido
+    """
+    # ──────────────────────────────────────────────────────────────────────────
+    # VALIDACIÓN DE CAMPOS OBLIGATORIOS
+    # ──────────────────────────────────────────────────────────────────────────
+    
+    # Validar campo obligatorio: amount (cantidad)
+    if 'amount' not in movement_data:
+        return 'Movement must have amount field'
+    
+    # Validar tipo de dato del amount (debe ser numérico)
+    if not isinstance(movement_data['amount'], (int, float)):
+        return 'Amount must be a number'
+    
+    # Validar que al menos uno de origin o destination esté presente
+    if 'origin' not in movement_data and 'destination' not in movement_data:
+        return 'Movement must have at least origin or destination'
+    
+    # ──────────────────────────────────────────────────────────────────────────
+    # VALIDACIONES ESPECÍFICAS POR TIPO DE MOVIMIENTO
+    # ──────────────────────────────────────────────────────────────────────────
+    
+    movement_type = movement_data.get('type', '')
+    
+    # Validar campos requeridos según el tipo de movimiento
+    if movement_type == 'Ingreso':
+        if 'destination' not in movement_data or not movement_data['destination']:
+            return 'Los ingresos requieren una cuenta destino'
+    elif movement_type == 'Gasto':
+        if 'origin' not in movement_data or not movement_data['origin']:
+            return 'Los gastos requieren una cuenta origen'
+    elif movement_type in ['Transferencia', 'Inversión']:
+        if 'origin' not in movement_data or not movement_data['origin']:
+            return f'{movement_type}s requieren una cuenta origen'
+        if 'destination' not in movement_data or not movement_data['destination']:
+            return f'{movement_type}s requieren una cuenta destino'
+    
+    # ──────────────────────────────────────────────────────────────────────────
+    # VALIDACIÓN DE CAMPOS OPCIONALES
+    # ──────────────────────────────────────────────────────────────────────────
+    
+    # Validar tipo de movimiento si se proporciona
+    if 'type' in movement_data:
+        if movement_data['type'] not in VALID_MOVEMENT_TYPES:
+            return f'Invalid movement type. Must be one of: {VALID_MOVEMENT_TYPES}'
+    
+    # Validar formato de fecha si se proporciona (formato: YYYY-MM-DD)
+    if 'date' in movement_data:
+        try:
+            datetime.strptime(movement_data['date'], '%Y-%m-%d')
+        except ValueError:
+            return 'Date must be in YYYY-MM-DD format'
+    
+    # Validar campos de texto opcionales (descripción, origen, destino)
+    for field in ['description', 'origin', 'destination']:
+        if field in movement_data and not isinstance(movement_data[field], str):
+            return f'{field} must be a string'
+    
+    # Validar etiquetas si se proporcionan
+    if 'tags' in movement_data:
+        if not isinstance(movement_data['tags'], list):
+            return 'Tags must be an array'
+        
+        # Verificar que todas las etiquetas sean strings
+        for tag in movement_data['tags']:
+            if not isinstance(tag, str):
+                return 'All tags must be strings'
+    
+    # Validar los datos de la posición en inversiones con activo
+    if 'symbol' in movement_data or 'quantity' in movement_data:
+        if movement_type != 'Inversión':
+            return 'symbol y quantity solo se admiten en inversiones'
+        if not isinstance(movement_data.get('symbol'), str) or not movement_data['symbol']:
+            return 'symbol must be a non-empty string'
+        quantity = movement_data.get('quantity')
+        if not isinstance(quantity, (int, float)) or isinstance(quantity, bool) or quantity == 0:
+            return 'quantity must be a non-zero number'
+        movement_data['symbol'] = movement_data['symbol'].upper()
+    
+    # Validar la moneda: debe ser la base o tener tipos de cambio
+    if 'currency' in movement_data:
+        if not isinstance(movement_data['currency'], str):
+            return 'Currency must be a string'
+        movement_data['currency'] = movement_data['currency'].upper()
+        if movement_data['currency'] not in current_app.config['DATABASE'].fx.currencies():
+            return f"Unknown currency: {movement_data['currency']}"
+    
+    return None
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ENDPOINTS DE GESTIÓN DE MOVIMIENTOS
@@ -32,8 +203,22 @@ def list_movements():
     Retorna una lista con los índices de todos los movimientos del usuario,
     permitiendo al cliente saber cuántos movimientos hay y sus posiciones.
     
+    Si se indica algún parámetro de consulta, el filtrado, la ordenación y la
+    paginación se hacen en el servidor y se devuelven los movimientos completos.
+    
+    Query params (todos opcionales):
+        type (str): Tipos de movimiento separados por comas
+        account (str): Cuenta de origen o destino
+        minAmount, maxAmount (float): Rango de importes
+        from, to (str): Rango de fechas en formato YYYY-MM-DD
+        tags (str): Etiquetas separadas por comas (deben estar todas)
+        sort (str): date, amount, type o description; con ``-`` delante, descendente
+        limit, offset (int): Paginación
+    
     Returns:
-        JSON: Lista de índices disponibles para consultar movimientos
+        JSON: Lista de índices disponibles para consultar movimientos, o
+              {"total", "results": [{"index", "movement"}]} si hay parámetros
+        400: Si algún parámetro de consulta no es válido
         401: Si no hay sesión activa
         404: Si el usuario no existe
         500: Si hay error al acceder a los datos
@@ -50,16 +235,138 @@ def list_movements():
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
+    if any(param in request.args for param in QUERY_PARAMS):
+        try:
+            query = parse_movement_query(request.args)
+        except ValueError as ve:
+            return jsonify({'error': str(ve)}), 400
+        
+        try:
+            total, rows = current_app.config['DATABASE'].query_movements(user, query)
+            return jsonify({'total': total, 'results': [{'index': i, 'movement': m} for i, m in rows]})
+        except Exception as e:
+            return jsonify({'error': f'Error fetching movements: {str(e)}'}), 500
+    
     try:
-        # Obtener todos los movimientos del usuario
-        movements = current_app.config['DATABASE'].movements_repo.list(user)
+        # Contar los movimientos del usuario (sin cargarlos si no están en caché)
+        count = current_app.config['DATABASE'].count_movements(user)
         
         # Retornar lista de índices disponibles para consulta
-        return jsonify({"movements": list(range(len(movements)))})
+        return jsonify({"movements": list(range(count))})
     except Exception as e:
         return jsonify({'error': f'Error fetching movements: {str(e)}'}), 500
 
 
+@movements_bp.get('/search')
+def search_movements():
+    """
+    Buscar movimientos por texto
+
+    Busca en la descripción, las cuentas de origen y destino y las etiquetas.
+    Cada palabra de la consulta debe aparecer en el movimiento, completa, como
+    prefijo (``alq`` encuentra ``alquiler``; desde dos letras) o con alguna
+    errata. Los resultados se ordenan por relevancia y, a igualdad, por más
+    recientes.
+
+    Query params:
+        q (str): Texto a buscar
+        limit (int, opcional): Resultados por página (por defecto 20, máximo 100)
+        offset (int, opcional): Resultados a saltar (por defecto 0)
+
+    Returns:
+        JSON: {"total", "results": [{"index", "score", "movement"}]}
+        400: Si falta la consulta o la paginación no es válida
+        401: Si no hay sesión activa
+        404: Si el usuario no existe
+        500: Si hay error al acceder a los datos
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
+
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
+
+    # Buscar usuario en la base de datos
+    user = current_app.config['DATABASE'].read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    # Validar parámetros de consulta
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing search query'}), 400
+    try:
+        limit = parse_number(request.args, 'limit', int)
+        offset = parse_number(request.args, 'offset', int)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    limit = 20 if limit is None else limit
+    offset = 0 if offset is None else offset
+    if not 1 <= limit <= MAX_SEARCH_RESULTS or offset < 0:
+        return jsonify({'error': f'limit must be between 1 and {MAX_SEARCH_RESULTS} and offset non-negative'}), 400
+
+    try:
+        total, hits = current_app.config['DATABASE'].search_movements(user, query, limit, offset)
+        return jsonify({
+            'total': total,
+            'results': [{'index': i, 'score': round(score, 4), 'movement': m} for i, m, score in hits],
+        })
+    except Exception as e:
+        return jsonify({'error': f'Error searching movements: {str(e)}'}), 500
+
+
+@movements_bp.get('/totals')
+def movement_totals():
+    """
+    Obtener el importe total por tipo de movimiento en una misma moneda
+    
+    Cada movimiento se convierte con el tipo de cambio de su fecha. Se busca
+    un único tipo por cada par (moneda, fecha) y los importes se convierten
+    en bloque.
+    
+    Query params:
+        from, to (str, opcional): Rango de fechas en formato YYYY-MM-DD
+        currency (str, opcional): Moneda del resultado (por defecto la moneda base)
+    
+    Returns:
+        JSON: {"currency", "movements", "byType": {tipo: total}}
+        400: Si los parámetros no son válidos o falta algún tipo de cambio
+        401: Si no hay sesión activa
+        404: Si el usuario no existe
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
+    
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
+    
+    # Buscar usuario en la base de datos
+    database = current_app.config['DATABASE']
+    user = database.read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    # Validar parámetros de consulta
+    date_from = request.args.get('from')
+    date_to = request.args.get('to')
+    for value in (date_from, date_to):
+        if value is not None:
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+    currency = request.args.get('currency', database.fx.base_currency).upper()
+    if currency not in database.fx.currencies():
+        return jsonify({'error': f'Unknown currency: {currency}'}), 400
+    
+    try:
+        return jsonify(database.movement_totals(user, date_from, date_to, currency))
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+
+
 @movements_bp.get('/<int:movement_id>')
 def movement_detail(movement_id):
     """
@@ -90,15 +397,13 @@ def movement_detail(movement_id):
         return jsonify({'error': 'User not found'}), 404
     
     try:
-        # Obtener todos los movimientos del usuario
-        movements = current_app.config['DATABASE'].movements_repo.list(user)
+        # Obtener el movimiento en la posición especificada
+        movement = current_app.config['DATABASE'].read_movement(user, movement_id)
         
-        # Validar que el índice del movimiento sea válido
-        if movement_id < 0 or movement_id >= len(movements):
-            return jsonify({"error": "Movement not found"}), 404
-        
-        # Retornar el movimiento en la posición especificada
-        return jsonify({"movement": movements[movement_id]})
+        # Retornar el movimiento solicitado
+        return jsonify({"movement": movement})
+    except IndexError:
+        return jsonify({"error": "Movement not found"}), 404
     except Exception as e:
         return jsonify({'error': f'Error fetching movement: {str(e)}'}), 500
 
@@ -120,12 +425,20 @@ def create_movement():
                 "origin": "Cuenta origen",            # Opcional: cuenta de origen
                 "destination": "Cuenta destino",      # Opcional: cuenta de destino
                 "date": "2024-12-25",                # Opcional: fecha en formato YYYY-MM-DD
-                "tags": ["etiqueta1", "etiqueta2"]   # Opcional: etiquetas del movimiento
+                "tags": ["etiqueta1", "etiqueta2"],  # Opcional: etiquetas del movimiento
+                "symbol": "AAPL",                     # Opcional (Inversión): activo comprado o vendido
+                "quantity": 10,                       # Opcional (Inversión): títulos, negativo en ventas
+                "currency": "USD"                     # Opcional: moneda del importe si no es la de las cuentas
             }
         }
+    
+    Query Params:
+        skipDuplicates (bool, opcional): No registrar el movimiento si parece
+            un duplicado de otro ya existente (por defecto se registra y se avisa)
         
     Returns:
-        JSON: Mensaje de confirmación de creación exitosa
+        JSON: Mensaje de confirmación, con "duplicateOf" si parece un duplicado
+        200: Si el movimiento se ha descartado por duplicado
         400: Si los datos son inválidos o están incompletos
         401: Si no hay sesión activa
         404: Si el usuario no existe
@@ -164,90 +477,134 @@ def create_movement():
     if not isinstance(movement_data, dict):
         return jsonify({'error': 'Movement must be an object'}), 400
     
+    error = validate_movement(movement_data)
+    if error:
+        return jsonify({'error': error}), 400
+    
     # ──────────────────────────────────────────────────────────────────────────
-    # VALIDACIÓN DE CAMPOS OBLIGATORIOS
+    # REGISTRO DEL MOVIMIENTO EN LA BASE DE DATOS
     # ──────────────────────────────────────────────────────────────────────────
     
-    # Validar campo obligatorio: amount (cantidad)
-    if 'amount' not in movement_data:
-        return jsonify({'error': 'Movement must have amount field'}), 400
+    try:
+        # Entre cuentas de distinta moneda, dejar explícita la moneda del importe
+        current_app.config['DATABASE'].resolve_currency(user, movement_data)
+        
+        # Buscar movimientos con la misma huella en la ventana de fechas admitida
+        duplicates = current_app.config['DATABASE'].find_duplicates(user, movement_data)
+        if duplicates and request.args.get('skipDuplicates', 'false').lower() == 'true':
+            return jsonify({'message': 'Duplicate movement skipped', 'duplicateOf': duplicates}), 200
+        
+        # Actualizar los saldos y registrar el movimiento (se rechaza entero si algo falla)
+        current_app.config['DATABASE'].add_movement(user, movement_data)
+        response = {'message': 'Movement created successfully'}
+        if duplicates:
+            response['duplicateOf'] = duplicates
+        return jsonify(response), 201
+        
+    except ValueError as ve:
+        # Errores de validación de negocio (ej: saldo insuficiente, cuenta no encontrada)
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        # Otros errores del sistema
+        return jsonify({'error': f'Error creating movement: {str(e)}'}), 500
+
+
+@movements_bp.post('/import')
+def import_movements():
+    """
+    Importar un lote de movimientos detectando duplicados
     
-    # Validar tipo de dato del amount (debe ser numérico)
-    if not isinstance(movement_data['amount'], (int, float)):
-        return jsonify({'error': 'Amount must be a number'}), 400
+    Cada fila se valida como en la creación individual y se compara con el
+    índice de huellas del usuario (tipo, importe, descripción normalizada y
+    cuentas, con la tolerancia de fechas de DUPLICATE_TOLERANCE_DAYS), de
+    modo que el coste por fila no depende del tamaño del histórico. Los
+    duplicados dentro del propio lote también se detectan.
     
-    # Validar que al menos uno de origin o destination esté presente
-    if 'origin' not in movement_data and 'destination' not in movement_data:
-        return jsonify({'error': 'Movement must have at least origin or destination'}), 400
+    Request Body:
+        {
+            "movements": [{...}, {...}],   # Mismo formato que en POST /movements
+            "skipDuplicates": true         # Opcional: descartar duplicados (por defecto true)
+        }
+        
+    Returns:
+        JSON: {"created": [índices], "duplicates": [{"row", "duplicateOf"}], "errors": [{"row", "error"}]}
+        400: Si el cuerpo de la petición no es válido
+        401: Si no hay sesión activa
+        404: Si el usuario no existe
+        500: Si hay error al guardar en la base de datos
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
     
-    # ──────────────────────────────────────────────────────────────────────────
-    # VALIDACIONES ESPECÍFICAS POR TIPO DE MOVIMIENTO
-    # ──────────────────────────────────────────────────────────────────────────
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
     
-    movement_type = movement_data.get('type', '')
+    # Buscar usuario en la base de datos
+    user = current_app.config['DATABASE'].read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
     
-    # Validar campos requeridos según el tipo de movimiento
-    if movement_type == 'Ingreso':
-        if 'destination' not in movement_data or not movement_data['destination']:
-            return jsonify({'error': 'Los ingresos requieren una cuenta destino'}), 400
-    elif movement_type == 'Gasto':
-        if 'origin' not in movement_data or not movement_data['origin']:
-            return jsonify({'error': 'Los gastos requieren una cuenta origen'}), 400
-    elif movement_type in ['Transferencia', 'Inversión']:
-        if 'origin' not in movement_data or not movement_data['origin']:
-            return jsonify({'error': f'{movement_type}s requieren una cuenta origen'}), 400
-        if 'destination' not in movement_data or not movement_data['destination']:
-            return jsonify({'error': f'{movement_type}s requieren una cuenta destino'}), 400
+    # Verificar que la petición contenga JSON válido
+    if not request.is_json:
+        return jsonify({'error': 'Request must be JSON'}), 400
     
-    # ──────────────────────────────────────────────────────────────────────────
-    # VALIDACIÓN DE CAMPOS OPCIONALES
-    # ──────────────────────────────────────────────────────────────────────────
+    data = request.get_json()
+    if not data or not isinstance(data.get('movements'), list):
+        return jsonify({'error': 'Missing movements list'}), 400
+    skip_duplicates = data.get('skipDuplicates', True)
+    if not isinstance(skip_duplicates, bool):
+        return jsonify({'error': 'skipDuplicates must be a boolean'}), 400
+    
+    # Validar cada fila; las inválidas se informan y no se importan
+    rows, errors = [], []
+    for row, movement_data in enumerate(data['movements']):
+        error = validate_movement(movement_data) if isinstance(movement_data, dict) else 'Movement must be an object'
+        if error:
+            errors.append({'row': row, 'error': error})
+        else:
+            rows.append((row, movement_data))
     
-    # Validar tipo de movimiento si se proporciona
-    if 'type' in movement_data:
-        if movement_data['type'] not in VALID_MOVEMENT_TYPES:
-            return jsonify({'error': f'Invalid movement type. Must be one of: {VALID_MOVEMENT_TYPES}'}), 400
+    try:
+        result = current_app.config['DATABASE'].import_movements(
+            user, [movement for _, movement in rows], skip_duplicates)
+    except Exception as e:
+        return jsonify({'error': f'Error importing movements: {str(e)}'}), 500
     
-    # Validar formato de fecha si se proporciona (formato: YYYY-MM-DD)
-    if 'date' in movement_data:
-        try:
-            datetime.strptime(movement_data['date'], '%Y-%m-%d')
-        except ValueError:
-            return jsonify({'error': 'Date must be in YYYY-MM-DD format'}), 400
+    # Traducir las filas del lote válido a las de la petición
+    for entry in result['duplicates'] + result['errors']:
+        entry['row'] = rows[entry['row']][0]
+    result['errors'] = sorted(errors + result['errors'], key=lambda entry: entry['row'])
+    return jsonify(result), 200
+
+
+@movements_bp.get('/duplicates')
+def list_duplicates():
+    """
+    Obtener los grupos de movimientos sospechosos de estar duplicados
     
-    # Validar campos de texto opcionales (descripción, origen, destino)
-    for field in ['description', 'origin', 'destination']:
-        if field in movement_data and not isinstance(movement_data[field], str):
-            return jsonify({'error': f'{field} must be a string'}), 400
+    Dos movimientos se consideran duplicados si comparten tipo, importe,
+    descripción normalizada y cuentas, y sus fechas difieren como mucho en
+    DUPLICATE_TOLERANCE_DAYS días.
     
-    # Validar etiquetas si se proporcionan
-    if 'tags' in movement_data:
-        if not isinstance(movement_data['tags'], list):
-            return jsonify({'error': 'Tags must be an array'}), 400
-        
-        # Verificar que todas las etiquetas sean strings
-        for tag in movement_data['tags']:
-            if not isinstance(tag, str):
-                return jsonify({'error': 'All tags must be strings'}), 400
+    Returns:
+        JSON: {"groups": [[índices], ...]}
+        401: Si no hay sesión activa
+        404: Si el usuario no existe
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
     
-    # ──────────────────────────────────────────────────────────────────────────
-    # REGISTRO DEL MOVIMIENTO EN LA BASE DE DATOS
-    # ──────────────────────────────────────────────────────────────────────────
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
     
-    try:
-        # Actualizar saldos de cuentas según el tipo de movimiento
-        current_app.config['DATABASE'].update_account_balances(user, movement_data)
-        
-        # Registrar el movimiento en la base de datos
-        current_app.config['DATABASE'].register_movement(user, movement_data)
-        return jsonify({'message': 'Movement created successfully'}), 201
-        
-    except ValueError as ve:
-        # Errores de validación de negocio (ej: saldo insuficiente, cuenta no encontrada)
-        return jsonify({'error': str(ve)}), 400
-    except Exception as e:
-        # Otros errores del sistema
-        return jsonify({'error': f'Error creating movement: {str(e)}'}), 500
+    # Buscar usuario en la base de datos
+    user = current_app.config['DATABASE'].read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+    
+    return jsonify({'groups': current_app.config['DATABASE'].list_duplicates(user)})
 
 
 @movements_bp.delete('/<int:movement_id>')
@@ -287,27 +644,13 @@ def delete_movement(movement_id):
         return jsonify({'error': 'User not found'}), 404
     
     try:
-        # Obtener todos los movimientos del usuario
-        movements = current_app.config['DATABASE'].movements_repo.list(user)
-        
-        # Validar que el índice del movimiento sea válido
-        if movement_id < 0 or movement_id >= len(movements):
-            return jsonify({"error": "Movement not found"}), 404
-        
-        # Obtener el movimiento a eliminar antes de eliminarlo
-        movement_to_delete = movements[movement_id]
-        
-        # Revertir los cambios en los saldos de las cuentas
-        current_app.config['DATABASE'].revert_account_balances(user, movement_to_delete)
-        
-        # Eliminar el movimiento en la posición especificada
-        movements.pop(movement_id)
-        
-        # Guardar la lista actualizada de movimientos
-        current_app.config['DATABASE'].movements_repo.save(user, movements)
+        # Revertir los saldos y eliminar el movimiento en la posición especificada
+        current_app.config['DATABASE'].delete_movement(user, movement_id)
         
         # Retornar confirmación de eliminación exitosa
         return jsonify({'message': 'Movement deleted successfully'}), 200
+    except IndexError:
+        return jsonify({"error": "Movement not found"}), 404
     except ValueError as ve:
         # Errores de validación de negocio (ej: no se puede revertir por saldo insuficiente)
         return jsonify({'error': str(ve)}), 400
@@ -0,0 +1,79 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                             RUTAS DE PRECIOS                                 ║
+║                                                                              ║
+║  Este módulo expone las cotizaciones de mercado de los activos seguidos:     ║
+║  consulta por lotes y histórico diario.                                      ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+"""
+
+from flask import Blueprint, request, jsonify, current_app
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN DEL BLUEPRINT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+prices_bp = Blueprint('prices', __name__)
+
+# Número máximo de símbolos por consulta
+MAX_SYMBOLS = 100
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENDPOINTS DE PRECIOS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@prices_bp.get('')
+def prices():
+    """
+    Obtener la cotización de varios activos
+
+    Todos los símbolos se resuelven con una única consulta al proveedor
+    (o directamente desde la caché si los precios son recientes).
+
+    Query Params:
+        symbols (str): Símbolos separados por comas, p. ej. "AAPL,MSFT"
+
+    Returns:
+        JSON: {"prices": {símbolo: {"price", "fetchedAt", "stale"}}}
+        400: Si no se indican símbolos o son demasiados
+        401: Si no hay sesión activa
+        502: Si el proveedor de precios falla
+    """
+    # Validar que existe una sesión activa
+    if not request.cookies.get('username'):
+        return jsonify({'error': 'No username cookie found'}), 401
+
+    # Validar la lista de símbolos
+    symbols = [s.strip().upper() for s in request.args.get('symbols', '').split(',') if s.strip()]
+    if not symbols:
+        return jsonify({'error': 'symbols query parameter is required'}), 400
+    if len(symbols) > MAX_SYMBOLS:
+        return jsonify({'error': f'At most {MAX_SYMBOLS} symbols per request'}), 400
+
+    try:
+        return jsonify({'prices': current_app.config['PRICES'].get_many(symbols)})
+    except Exception as e:
+        return jsonify({'error': f'Error fetching prices: {str(e)}'}), 502
+
+
+@prices_bp.get('/<symbol>/history')
+def price_history(symbol):
+    """
+    Obtener el histórico diario de precios de un activo
+
+    Args:
+        symbol (str): Símbolo del activo
+
+    Returns:
+        JSON: {"symbol", "history": [{"date", "price"}]}
+        401: Si no hay sesión activa
+    """
+    # Validar que existe una sesión activa
+    if not request.cookies.get('username'):
+        return jsonify({'error': 'No username cookie found'}), 401
+
+    symbol = symbol.upper()
+    history = current_app.config['PRICES'].history(symbol)
+    return jsonify({'symbol': symbol, 'history': [
+        {'date': entry['date'], 'price': float(entry['price'])} for entry in history]})
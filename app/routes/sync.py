@@ -0,0 +1,72 @@
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                          RUTAS DE SINCRONIZACIÓN                             ║
+║                                                                              ║
+║  Este módulo permite a los clientes sincronizarse de forma incremental a     ║
+║  partir de la secuencia del último cambio que conocen.                       ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+"""
+
+from flask import Blueprint, request, jsonify, current_app
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURACIÓN DEL BLUEPRINT
+# ═══════════════════════════════════════════════════════════════════════════════
+
+sync_bp = Blueprint('sync', __name__)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENDPOINTS DE SINCRONIZACIÓN
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@sync_bp.get('')
+def sync():
+    """
+    Obtener los cambios posteriores a una secuencia
+
+    Devuelve solo las altas y bajas de movimientos y los cambios de saldo
+    ocurridos después de ``since``. Si no se indica ``since`` o el registro de
+    cambios ya no cubre ese punto, devuelve una instantánea completa.
+
+    Query Params:
+        since (int): Secuencia del último cambio aplicado por el cliente
+
+    Returns:
+        JSON: {"seq", "full": false, "changes": [...]} con los cambios en orden
+              {"seq", "full": true, "accounts": [...], "movements": [...]}
+              si es necesaria una instantánea
+        400: Si la secuencia no es un entero
+        401: Si no hay sesión activa
+        404: Si el usuario no existe
+    """
+    # Obtener nombre de usuario desde la cookie de sesión
+    username = request.cookies.get('username')
+    
+    # Validar que existe una sesión activa
+    if not username:
+        return jsonify({'error': 'No username cookie found'}), 401
+    
+    # Buscar usuario en la base de datos
+    database = current_app.config['DATABASE']
+    user = database.read_user(username)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    # Validar la secuencia de partida si se proporciona
+    since = request.args.get('since')
+    try:
+        since = int(since) if since is not None else None
+    except ValueError:
+        return jsonify({'error': 'since must be an integer'}), 400
+
+    # Intentar responder con los cambios incrementales
+    if since is not None:
+        delta = database.changes_since(user, since)
+        if delta is not None:
+            seq, changes = delta
+            return jsonify({'seq': seq, 'full': False, 'changes': changes})
+
+    # Sin secuencia o registro recortado: instantánea completa
+    snapshot = database.snapshot(user)
+    return jsonify({'full': True, **snapshot})
@@ -0,0 +1,60 @@
+"""
+Mantenimiento del almacenamiento de movimientos de los usuarios.
+
+Uso:
+    python migrate_movements.py                    # particionar todos los usuarios por mes
+    python migrate_movements.py --granularity year
+    python migrate_movements.py --user ana
+    python migrate_movements.py --compact          # comprimir las particiones frías
+    python migrate_movements.py --report           # tamaño y latencia de lectura por partición
+"""
+import argparse
+from app import create_database
+
+
+def print_report(user: dict, report: list) -> None:
+    """Muestra las particiones del usuario y compara datos calientes y fríos."""
+    print(f"{user['name']}:")
+    for entry in report:
+        state = "cold" if entry['compressed'] else "hot"
+        print(f"  {entry['key']:>8}  {state:<4} {entry['rows']:>8} rows "
+              f"{entry['bytes']:>10} bytes {entry['read_ms']:>9.3f} ms")
+    for state, compressed in (("hot", False), ("cold", True)):
+        entries = [e for e in report if e['compressed'] == compressed]
+        rows = sum(e['rows'] for e in entries)
+        if not rows:
+            continue
+        size = sum(e['bytes'] for e in entries)
+        elapsed = sum(e['read_ms'] for e in entries)
+        print(f"  {state:>8}: {size / rows:.1f} bytes/row, {elapsed / rows * 1000:.2f} ms per 1000 rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Particiona, comprime e inspecciona los movimientos")
+    parser.add_argument("--granularity", choices=["month", "year"], default="month")
+    parser.add_argument("--user", help="Procesar solo este usuario")
+    parser.add_argument("--compact", action="store_true", help="Comprimir las particiones frías")
+    parser.add_argument("--report", action="store_true", help="Mostrar tamaño y latencia por partición")
+    args = parser.parse_args()
+
+    database = create_database()
+    users = database.users_repo.list()
+    if args.user:
+        users = [u for u in users if u['name'] == args.user]
+        if not users:
+            parser.error(f"User {args.user} not found")
+
+    for user in users:
+        if args.report:
+            print_report(user, database.movements_repo.storage_report(user))
+        elif args.compact:
+            compressed = database.compact_movements(user)
+            print(f"{user['name']}: {len(compressed)} partitions compressed {compressed}")
+        else:
+            database.migrate_movements(user, args.granularity)
+            count = database.count_movements(user)
+            print(f"{user['name']}: {count} movements -> {args.granularity} partitions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Instantánea de la caché para que los workers arranquen en caliente.
+
+Lee todos los usuarios, cuentas y movimientos, construye sus índices y los
+guarda en un único fichero binario junto con la versión y las fechas de
+modificación de los ficheros de origen. Con ``LOAD_SNAPSHOT`` activado,
+``create_app`` la carga al arrancar y descarta los usuarios que hayan
+cambiado desde entonces; tras un despliegue con otro código se ignora entera.
+
+Uso:
+    python snapshot.py                    # generar la instantánea una vez
+    python snapshot.py --interval 300     # regenerarla cada 5 minutos
+    python snapshot.py --check            # cuántos usuarios siguen vigentes
+"""
+import argparse
+import os
+import time
+from os import path
+from app import DATA_PATH, create_database
+from app.config import Config
+from app.database.rustic_database import RusticDatabase
+from app.database.snapshot import read_snapshot, write_snapshot
+
+
+def generate(database: RusticDatabase, target: str) -> None:
+    start = time.perf_counter()
+    data = database.export_cache()
+    write_snapshot(target, data)
+    movements = sum(len(entry['movements']) for entry in data['views'].values())
+    print(f"{len(data['views'])}/{len(data['users'])} users, {movements} movements "
+          f"in {time.perf_counter() - start:.2f} s -> {target} ({os.path.getsize(target)} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera la instantánea de la caché de datos")
+    parser.add_argument("--output", default=Config.SNAPSHOT_PATH or path.join(DATA_PATH, "cache.snapshot"))
+    parser.add_argument("--interval", type=float, help="Regenerar cada N segundos")
+    parser.add_argument("--check", action="store_true", help="Comprobar la instantánea existente")
+    args = parser.parse_args()
+
+    if args.check:
+        start = time.perf_counter()
+        data = read_snapshot(args.output)
+        if data is None:
+            parser.error(f"No snapshot at {args.output}")
+        loaded, stale = create_database().import_cache(data)
+        print(f"{loaded} users warm, {stale} stale, loaded in {time.perf_counter() - start:.2f} s")
+        return
+
+    # La misma instancia entre iteraciones: solo se releen los usuarios que cambian
+    database = create_database()
+    while True:
+        generate(database, args.output)
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Generación de los extractos mensuales de todos los usuarios.
+
+Cada usuario se procesa en un proceso del pool y su extracto se escribe en
+``<salida>/<mes>/<usuario>.json`` en cuanto está listo, sin acumular los
+resultados en el proceso principal.
+
+Uso:
+    python statements.py                       # mes anterior, todos los usuarios
+    python statements.py --month 2024-03
+    python statements.py --user ana
+    python statements.py --workers 8
+    python statements.py --output /ruta/extractos
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from os import path
+from app import DATA_PATH, create_database
+from app.analytics.statement import build_statement, month_bounds
+from app.market.fx_table import MovementAmounts
+from app.database.serializers.json_serializer import StdJsonSerializer
+
+# Base de datos de cada proceso del pool (se crea una vez por proceso)
+_database = None
+
+
+def init_worker() -> None:
+    global _database
+    _database = create_database()
+
+
+def generate_statement(user: dict, month: str, output_dir: str) -> tuple:
+    """
+    Calcula y escribe el extracto de un usuario (se ejecuta en un proceso del pool).
+
+    Returns:
+        (nombre del usuario, movimientos del mes)
+    """
+    month_start, _ = month_bounds(month)
+    # Cuentas y movimientos de la misma versión: reintentar si alguien escribe entre medias
+    while True:
+        seq = _database.current_seq(user)
+        accounts = _database.read_accounts(user)
+        movements = [m for _, m in _database.read_movements_range(user, month_start)]
+        if _database.current_seq(user) == seq:
+            break
+
+    statement = build_statement(month, accounts, movements, MovementAmounts(_database.fx, accounts))
+    statement['user'] = user['name']
+    statement['seq'] = seq
+
+    target = path.join(output_dir, f"{user['name']}.json")
+    StdJsonSerializer().dump(statement, target + ".tmp")
+    os.replace(target + ".tmp", target)
+    return user['name'], statement['movements']
+
+
+def previous_month(today: date) -> str:
+    year, month = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+    return f"{year:04d}-{month:02d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera los extractos mensuales de los usuarios")
+    parser.add_argument("--month", default=previous_month(date.today()), help="Mes en formato YYYY-MM")
+    parser.add_argument("--user", help="Procesar solo este usuario")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos del pool")
+    parser.add_argument("--output", default=path.join(DATA_PATH, "statements"), help="Carpeta de salida")
+    args = parser.parse_args()
+    if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", args.month):
+        parser.error("month must be in YYYY-MM format")
+    if args.workers < 1:
+        parser.error("workers must be positive")
+
+    users = create_database().users_repo.list()
+    if args.user:
+        users = [u for u in users if u['name'] == args.user]
+        if not users:
+            parser.error(f"User {args.user} not found")
+
+    output_dir = path.join(args.output, args.month)
+    os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    total_movements = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as pool:
+        futures = {pool.submit(generate_statement, user, args.month, output_dir): user['name'] for user in users}
+        for future in as_completed(futures):
+            try:
+                name, count = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: error {e}")
+                continue
+            total_movements += count
+            print(f"{name}: {count} movements")
+
+    elapsed = time.perf_counter() - start
+    done = len(users) - failed
+    print(f"{done} statements for {args.month} in {elapsed:.2f} s with {args.workers} workers "
+          f"({done / elapsed:.1f} users/s, {total_movements / elapsed:.0f} movements/s) -> {output_dir}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()